@@ -1,34 +1,360 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Header, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from dotenv import load_dotenv
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
 import logging
 from pathlib import Path
+from urllib.parse import urlencode
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import List
 from datetime import datetime, timezone, timedelta
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import csv
+import hashlib
+import io
+import ipaddress
+import json
+import orjson
+import threading
+from dateutil import parser as date_parser
 from passlib.context import CryptContext
 import jwt
+import time
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+current_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_request_stats", default=None)
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+class MetricsRegistry:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict = {}
+        self._counters: dict = {}
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def inc(self, name: str, labels: dict, value: float = 1) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self) -> str:
+        def fmt(labels) -> str:
+            return ",".join(f'{k}="{str(v)}"'.replace("\n", " ") for k, v in labels)
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        for name in sorted({key[0] for key, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in histograms:
+                if metric != name:
+                    continue
+                for bound, count in zip(self.buckets, histogram["buckets"]):
+                    lines.append(f'{name}_bucket{{{fmt(labels + (("le", bound),))}}} {count}')
+                lines.append(f'{name}_bucket{{{fmt(labels + (("le", "+Inf"),))}}} {histogram["count"]}')
+                lines.append(f"{name}_sum{{{fmt(labels)}}} {histogram['sum']}")
+                lines.append(f"{name}_count{{{fmt(labels)}}} {histogram['count']}")
+        for name in sorted({key[0] for key, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in counters:
+                if metric == name:
+                    lines.append(f"{name}{{{fmt(labels)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry(LATENCY_BUCKETS)
+
+class QueryMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending: dict = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        self._pending[(event.connection_id, event.request_id)] = (collection, current_route.get())
+
+    def _finish(self, event, failed: bool):
+        collection, route = self._pending.pop((event.connection_id, event.request_id), ("", None))
+        seconds = event.duration_micros / 1_000_000
+        labels = {"command": event.command_name, "collection": collection}
+        metrics.observe("scout_mongo_command_duration_seconds", labels, seconds)
+        if failed:
+            metrics.inc("scout_mongo_command_failures_total", labels)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            metrics.inc("scout_mongo_slow_commands_total", labels)
+            logging.getLogger(__name__).warning(
+                "Slow Mongo command %s on %s took %.1f ms (route %s)",
+                event.command_name, collection or "-", seconds * 1000, route or "-"
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+query_listener = QueryMetricsListener()
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: dict = {}
+
+    def _update(self, address, **deltas):
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            pool = self._pools.setdefault(key, {"open": 0, "in_use": 0, "waiting": 0, "check_out_failures": 0})
+            for name, delta in deltas.items():
+                pool[name] += delta
+
+    def snapshot(self, max_pool_size: int) -> dict:
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        for pool in pools.values():
+            pool["saturation"] = round(pool["in_use"] / max_pool_size, 3) if max_pool_size else 0.0
+        return pools
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, waiting=-1, check_out_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+pool_monitor = PoolMonitor()
+
+def optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_MAX_IDLE_TIME_MS = optional_int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = optional_int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = optional_int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '10000'))
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', '2'))
+READINESS_MAX_POOL_SATURATION = float(os.environ.get('READINESS_MAX_POOL_SATURATION', '1.0'))
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    connect=False,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    readPreference=MONGO_READ_PREFERENCE,
+    event_listeners=[query_listener, pool_monitor]
+)
 db = client[os.environ['DB_NAME']]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_connection_pool()
+    await response_cache.start()
+    await startup_indexes()
+    await startup_stats()
+    await startup_token_revocations()
+    await job_queue.start()
+    await startup_archival()
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await job_queue.stop(JOB_SHUTDOWN_GRACE_SECONDS)
+        await response_cache.stop()
+        await shutdown_db_client()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+app.state.ready = False
 api_router = APIRouter(prefix="/api")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("role", ASCENDING), ("_id", ASCENDING)], name="role_id"),
+    ],
+    "events": [
+        IndexModel([("event_name", ASCENDING)], name="event_name_unique", unique=True),
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)], name="date_id"),
+        IndexModel([("created_by", ASCENDING), ("_id", ASCENDING)], name="created_by_id"),
+        IndexModel([("event_name", TEXT), ("description", TEXT)], name="event_text", weights={"event_name": 10, "description": 1}),
+    ],
+    "memberships": [
+        IndexModel([("event_id", ASCENDING), ("kind", ASCENDING), ("email", ASCENDING)], name="event_id_kind_email_unique", unique=True),
+        IndexModel([("email", ASCENDING), ("kind", ASCENDING), ("event_id", ASCENDING)], name="email_kind_event_id"),
+    ],
+    "events_archive": [
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)], name="date_id"),
+        IndexModel([("event_name", ASCENDING)], name="event_name"),
+    ],
+    "rankings": [
+        IndexModel([("score", DESCENDING), ("_id", ASCENDING)], name="score_desc"),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+    ],
+    "applied_jobs": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "token_revocations": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+}
+
+OBSOLETE_INDEXES = {
+    "events": ["users_assigned", "admins_joined"],
+    "memberships": ["event_kind_email_unique", "email_kind_event"],
+}
+
+MEMBERSHIP_FIELDS = {"assigned": "users_assigned", "joined": "admins_joined"}
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_MAX_CONCURRENCY', str(PASSWORD_HASH_WORKERS)))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '0'))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 security = HTTPBearer(auto_error=False)
 
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
+ACCESS_TOKEN_EXPIRE_MINUTES = float(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '15'))
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', '7'))
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', '2'))
+TOKEN_REVOCATION_CLOCK_SKEW_SECONDS = float(os.environ.get('TOKEN_REVOCATION_CLOCK_SKEW_SECONDS', '5'))
+TOKEN_LEEWAY_SECONDS = float(os.environ.get('TOKEN_LEEWAY_SECONDS', '5'))
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '30'))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.environ.get('PRINCIPAL_CACHE_MAX_SIZE', '10000'))
+
+LOGIN_IP_BURST = float(os.environ.get('LOGIN_IP_BURST', '200'))
+LOGIN_IP_REFILL_PER_SECOND = float(os.environ.get('LOGIN_IP_REFILL_PER_SECOND', '10'))
+LOGIN_EMAIL_BURST = float(os.environ.get('LOGIN_EMAIL_BURST', '5'))
+LOGIN_EMAIL_REFILL_PER_SECOND = float(os.environ.get('LOGIN_EMAIL_REFILL_PER_SECOND', '0.05'))
+LOGIN_LOCKOUT_THRESHOLD = int(os.environ.get('LOGIN_LOCKOUT_THRESHOLD', '5'))
+LOGIN_LOCKOUT_BASE_SECONDS = float(os.environ.get('LOGIN_LOCKOUT_BASE_SECONDS', '30'))
+LOGIN_LOCKOUT_MAX_SECONDS = float(os.environ.get('LOGIN_LOCKOUT_MAX_SECONDS', '900'))
+LOGIN_FAILURE_WINDOW_SECONDS = float(os.environ.get('LOGIN_FAILURE_WINDOW_SECONDS', '900'))
+LOGIN_THROTTLE_MAX_KEYS = int(os.environ.get('LOGIN_THROTTLE_MAX_KEYS', '100000'))
+TRUSTED_PROXIES = [ipaddress.ip_network(n.strip()) for n in os.environ.get(
+    'TRUSTED_PROXIES', '127.0.0.1/32,::1/128').split(',') if n.strip()]
+
+DEFAULT_PAGE_LIMIT = int(os.environ.get('DEFAULT_PAGE_LIMIT', '1000'))
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', '1000'))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+STATS_DOCUMENT_ID = "totals"
+STATS_RECONCILE_INTERVAL_SECONDS = float(os.environ.get('STATS_RECONCILE_INTERVAL_SECONDS', '300'))
+ROLE_COUNTERS = {"user": "total_users", "admin": "total_admins"}
+
+RANKED_ROLES = ["user"]
+LEADERBOARD_EVENT_POINTS = int(os.environ.get('LEADERBOARD_EVENT_POINTS', '1'))
+LEADERBOARD_ACHIEVEMENT_POINTS = int(os.environ.get('LEADERBOARD_ACHIEVEMENT_POINTS', '3'))
+LEADERBOARD_DEFAULT_LIMIT = int(os.environ.get('LEADERBOARD_DEFAULT_LIMIT', '10'))
+LEADERBOARD_MAX_LIMIT = int(os.environ.get('LEADERBOARD_MAX_LIMIT', '100'))
+RANKINGS_REBUILD_LEASE_SECONDS = float(os.environ.get('RANKINGS_REBUILD_LEASE_SECONDS', '300'))
+RANKING_FIELDS = {"_id": 1, "name": 1, "events_joined_count": 1, "achievements_count": 1, "score": 1}
+
+CHANGE_FEED_QUEUE_SIZE = int(os.environ.get('CHANGE_FEED_QUEUE_SIZE', '256'))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.environ.get('CHANGE_FEED_HEARTBEAT_SECONDS', '15'))
+CHANGE_FEED_TICKET_SECONDS = float(os.environ.get('CHANGE_FEED_TICKET_SECONDS', '30'))
+
+MAX_BULK_SIZE = int(os.environ.get('MAX_BULK_SIZE', '1000'))
+CACHE_CONTROL = os.environ.get('CACHE_CONTROL', 'private, no-cache')
+ASSIGNMENT_TRANSACTIONS = os.environ.get('ASSIGNMENT_TRANSACTIONS', 'false').lower() == 'true'
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '4'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', '1'))
+JOB_RECOVERY_INTERVAL_SECONDS = float(os.environ.get('JOB_RECOVERY_INTERVAL_SECONDS', '30'))
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', '300'))
+JOB_SHUTDOWN_GRACE_SECONDS = float(os.environ.get('JOB_SHUTDOWN_GRACE_SECONDS', '5'))
+JOB_APPLIED_TTL_SECONDS = float(os.environ.get('JOB_APPLIED_TTL_SECONDS', '86400'))
+
+ARCHIVE_AFTER_DAYS = float(os.environ.get('ARCHIVE_AFTER_DAYS', '30'))
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get('ARCHIVE_INTERVAL_SECONDS', '3600'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '500'))
+
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '30'))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '1000'))
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'scout')
+CACHE_LOCK_SECONDS = float(os.environ.get('CACHE_LOCK_SECONDS', '5'))
+CACHE_NAMESPACES = ["users", "events", "stats"]
 
 class UserBase(BaseModel):
     name: str
@@ -53,14 +379,27 @@ class User(UserBase):
 
 class UserWithToken(User):
     token: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class TokenPair(BaseModel):
+    token: str
+    refresh_token: str
+
+class Principal(BaseModel):
+    email: str
+    role: str
 
 class EventBase(BaseModel):
     event_name: str
-    date: str
+    date: datetime
     description: str
 
 class Event(EventBase):
     model_config = ConfigDict(extra="ignore")
+    id: Optional[str] = None
     created_by: str
     admins_joined: List[str] = []
     users_assigned: List[str] = []
@@ -68,26 +407,886 @@ class Event(EventBase):
 class AchievementAdd(BaseModel):
     achievement: str
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(min_length=1, max_length=MAX_BULK_SIZE)
+
+class BulkAssign(BaseModel):
+    user_emails: List[str] = Field(min_length=1, max_length=MAX_BULK_SIZE)
+
+class BulkRowResult(BaseModel):
+    index: int
+    email: str
+    status: str
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkRowResult]
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, User]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, email: str) -> Optional[User]:
+        entry = self._entries.get(email)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[email]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(email)
+        self.hits += 1
+        return user
+
+    def set(self, email: str, user: User) -> None:
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        self._entries[email] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, email: str) -> None:
+        self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
+class InMemoryRateLimitBackend:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._failures: "OrderedDict[str, dict]" = OrderedDict()
+
+    def _store(self, entries: OrderedDict, key: str, value) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    async def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        if tokens < 1:
+            self._store(self._buckets, key, (tokens, now))
+            return (1 - tokens) / refill_per_second if refill_per_second > 0 else float("inf")
+        self._store(self._buckets, key, (tokens - 1, now))
+        return 0.0
+
+    async def lockout_remaining(self, key: str) -> float:
+        entry = self._failures.get(key)
+        return max(0.0, entry["locked_until"] - time.monotonic()) if entry else 0.0
+
+    async def record_failure(self, key: str, window_seconds: float) -> int:
+        now = time.monotonic()
+        entry = self._failures.get(key)
+        if entry is None or now - entry["last_failure"] > window_seconds:
+            entry = {"count": 0, "last_failure": now, "locked_until": 0.0}
+        entry["count"] += 1
+        entry["last_failure"] = now
+        self._store(self._failures, key, entry)
+        return entry["count"]
+
+    async def lock(self, key: str, seconds: float) -> None:
+        entry = self._failures.get(key)
+        if entry is not None:
+            entry["locked_until"] = time.monotonic() + seconds
+
+    async def reset(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"buckets": len(self._buckets), "tracked_failures": len(self._failures), "max_keys": self.max_keys}
+
+class LoginThrottle:
+    def __init__(self, backend):
+        self.backend = backend
+        self.rejected = {"ip": 0, "email": 0, "lockout": 0}
+        self.lockouts = 0
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected[reason] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(max(1, int(min(retry_after, LOGIN_LOCKOUT_MAX_SECONDS) + 0.999)))}
+        )
+
+    async def check(self, ip: str, email: str) -> None:
+        locked_for = await self.backend.lockout_remaining(f"email:{email}")
+        if locked_for > 0:
+            self._reject("lockout", locked_for)
+        retry_after = await self.backend.consume(f"ip:{ip}", LOGIN_IP_BURST, LOGIN_IP_REFILL_PER_SECOND)
+        if retry_after > 0:
+            self._reject("ip", retry_after)
+        retry_after = await self.backend.consume(f"email:{email}", LOGIN_EMAIL_BURST, LOGIN_EMAIL_REFILL_PER_SECOND)
+        if retry_after > 0:
+            self._reject("email", retry_after)
+
+    async def failed(self, email: str) -> None:
+        failures = await self.backend.record_failure(f"email:{email}", LOGIN_FAILURE_WINDOW_SECONDS)
+        if failures >= LOGIN_LOCKOUT_THRESHOLD:
+            seconds = min(LOGIN_LOCKOUT_MAX_SECONDS, LOGIN_LOCKOUT_BASE_SECONDS * 2 ** (failures - LOGIN_LOCKOUT_THRESHOLD))
+            await self.backend.lock(f"email:{email}", seconds)
+            self.lockouts += 1
+            logger.warning("Locked out logins for %s for %.0f s after %d failures", email, seconds, failures)
+
+    async def succeeded(self, email: str) -> None:
+        await self.backend.reset(f"email:{email}")
+
+    def stats(self) -> dict:
+        return {"rejected": dict(self.rejected), "lockouts": self.lockouts, **self.backend.stats()}
+
+login_throttle = LoginThrottle(InMemoryRateLimitBackend(LOGIN_THROTTLE_MAX_KEYS))
+
+def trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    if not trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+USER_FIELDS = set(User.model_fields)
+EVENT_FIELDS = set(Event.model_fields)
+ARCHIVED_EVENT_FIELDS = EVENT_FIELDS | {"archived_at", "deleted_at", "deleted_by"}
+
+def build_projection(fields: Optional[str], allowed: set) -> dict:
+    if not fields:
+        return {"_id": 1, **{name: 1 for name in allowed}}
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {"_id": 1, **{name: 1 for name in requested}}
+
+def parse_cursor(after: Optional[str]) -> Optional[ObjectId]:
+    if not after:
+        return None
+    try:
+        return ObjectId(after)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_date_cursor(after: Optional[str]) -> Optional[tuple[datetime, ObjectId]]:
+    if not after:
+        return None
+    try:
+        millis, cursor_id = after.split("_", 1)
+        return datetime.fromtimestamp(int(millis) / 1000, timezone.utc), ObjectId(cursor_id)
+    except (ValueError, OverflowError, InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def date_cursor(doc: dict) -> str:
+    date = doc["date"] if doc["date"].tzinfo else doc["date"].replace(tzinfo=timezone.utc)
+    return f"{round(date.timestamp() * 1000)}_{doc['_id']}"
+
+async def query_page(
+    collection, query: dict, projection: dict, limit: int, after: Optional[str] = None, strip_id: bool = True, by_date: bool = False
+) -> tuple[List[dict], Optional[str]]:
+    if by_date:
+        position = parse_date_cursor(after)
+        after_filter = {"$or": [{"date": {"$gt": position[0]}}, {"date": position[0], "_id": {"$gt": position[1]}}]} if position else None
+        sort = [("date", 1), ("_id", 1)]
+    else:
+        cursor_id = parse_cursor(after)
+        after_filter = {"_id": {"$gt": cursor_id}} if cursor_id is not None else None
+        sort = [("_id", 1)]
+    if after_filter is not None:
+        query = {"$and": [query, after_filter]} if set(query) & set(after_filter) else {**query, **after_filter}
+    docs = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = date_cursor(docs[-1]) if by_date else str(docs[-1]["_id"])
+    if strip_id:
+        for doc in docs:
+            doc.pop("_id", None)
+    return docs, next_cursor
+
+def trusted_json(content, response: Response) -> ORJSONResponse:
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+def cache_key(request: Request, response: Response) -> str:
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}|{response.headers.get('ETag', '')}"
+
+async def load_cached_page(namespace: str, key: str, load_page) -> tuple[Optional[str], bytes]:
+    async def load() -> bytes:
+        docs, next_cursor = await load_page()
+        return (next_cursor or "").encode() + b"\n" + orjson.dumps(docs, option=orjson.OPT_NON_STR_KEYS)
+    
+    next_cursor, body = (await response_cache.get_or_load(namespace, key, load)).split(b"\n", 1)
+    return next_cursor.decode() or None, body
+
+async def cached_page(request: Request, response: Response, namespace: str, load_page) -> Response:
+    next_cursor, body = await load_cached_page(namespace, cache_key(request, response), load_page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def csv_value(value) -> str:
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+async def iter_batches(cursor, hydrate):
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            for hydrated in await hydrate(batch):
+                yield hydrated
+            batch = []
+    if batch:
+        for hydrated in await hydrate(batch):
+            yield hydrated
+
+async def iter_ndjson(docs):
+    async for doc in docs:
+        yield json.dumps(doc, default=json_default) + "\n"
+
+async def iter_csv(docs, columns: List[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for doc in docs:
+        writer.writerow([csv_value(doc.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_export(collection, query: dict, columns: List[str], export_format: str, filename: str, hydrate=None) -> StreamingResponse:
+    projection = {"_id": 1 if hydrate else 0, **{column: 1 for column in columns}}
+    docs = collection.find(query, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    if hydrate is not None:
+        docs = iter_batches(docs, hydrate)
+    if export_format == "csv":
+        body, media_type = iter_csv(docs, columns), "text/csv"
+    else:
+        body, media_type = iter_ndjson(docs), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+class PasswordHasher:
+    def __init__(self, context: CryptContext, workers: int, max_concurrency: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_waiting_seen = 0
+
+    async def _run(self, fn, *args):
+        if self.max_queue and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
+        self.waiting += 1
+        self.max_waiting_seen = max(self.max_waiting_seen, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "queue_depth": self.waiting,
+            "max_queue_depth_seen": self.max_waiting_seen,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_CONCURRENCY, PASSWORD_HASH_MAX_QUEUE)
+
+class ChangeBroadcaster:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set = set()
+        self._sequence = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, change_type: str, data: dict) -> None:
+        self._sequence += 1
+        self.published += 1
+        frame = f"id: {self._sequence}\nevent: {change_type}\ndata: {json.dumps(data, default=json_default)}\n\n"
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                self.dropped += 1
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "dropped_subscribers": self.dropped
+        }
+
+change_feed = ChangeBroadcaster(CHANGE_FEED_QUEUE_SIZE)
+
+class JobQueue:
+    def __init__(self, workers: int, max_attempts: int, retry_base_seconds: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.handlers: dict = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._scheduled: set = set()
+        self._tasks: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def handler(self, name: str):
+        def register(fn):
+            self.handlers[name] = fn
+            return fn
+        return register
+
+    async def enqueue(self, name: str, payload: dict) -> ObjectId:
+        now = datetime.now(timezone.utc)
+        result = await db.jobs.insert_one({
+            "name": name, "payload": payload, "status": "pending", "attempts": 0, "run_at": now, "created_at": now
+        })
+        self._put(result.inserted_id)
+        return result.inserted_id
+
+    def _put(self, job_id: ObjectId) -> None:
+        if self._queue is None or job_id in self._scheduled:
+            return
+        self._scheduled.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    async def _run(self, job_id: ObjectId) -> None:
+        job = await db.jobs.find_one_and_update(
+            {"_id": job_id, "status": "pending"},
+            {"$set": {"status": "running", "locked_at": datetime.now(timezone.utc)}, "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            return
+        self.in_flight += 1
+        try:
+            await self.handlers[job["name"]](job)
+        except Exception as exc:
+            await self._retry_or_fail(job, exc)
+        else:
+            await db.jobs.delete_one({"_id": job_id})
+            self.completed += 1
+        finally:
+            self.in_flight -= 1
+
+    async def _retry_or_fail(self, job: dict, exc: Exception) -> None:
+        if job["attempts"] >= self.max_attempts:
+            self.failed += 1
+            logger.error("Job %s (%s) failed after %d attempts: %s", job["_id"], job["name"], job["attempts"], exc)
+            await db.jobs.update_one({"_id": job["_id"]}, {"$set": {"status": "failed", "error": str(exc)}})
+            return
+        delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+        self.retried += 1
+        logger.warning("Job %s (%s) failed, retrying in %.1f s: %s", job["_id"], job["name"], delay, exc)
+        await db.jobs.update_one({"_id": job["_id"]}, {"$set": {
+            "status": "pending", "error": str(exc), "run_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+        }})
+        asyncio.get_running_loop().call_later(delay, self._put, job["_id"])
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._scheduled.discard(job_id)
+            try:
+                await self._run(job_id)
+            except PyMongoError as exc:
+                logger.error("Job %s could not be processed: %s", job_id, exc)
+            finally:
+                self._queue.task_done()
+
+    async def recover(self) -> int:
+        now = datetime.now(timezone.utc)
+        await db.jobs.update_many(
+            {"status": "running", "locked_at": {"$lt": now - timedelta(seconds=JOB_STALE_SECONDS)}},
+            {"$set": {"status": "pending"}}
+        )
+        recovered = 0
+        async for job in db.jobs.find({"status": "pending", "run_at": {"$lte": now}}, {"_id": 1}).sort("run_at", ASCENDING):
+            self._put(job["_id"])
+            recovered += 1
+        return recovered
+
+    async def _recover_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_RECOVERY_INTERVAL_SECONDS)
+            try:
+                await self.recover()
+            except PyMongoError as exc:
+                logger.error("Job recovery failed: %s", exc)
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._scheduled = set()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._recover_periodically()))
+        recovered = await self.recover()
+        if recovered:
+            logger.info("Resumed %d pending jobs", recovered)
+
+    async def wait_idle(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, grace_seconds: float) -> None:
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), grace_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping job workers with %d jobs still queued", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    async def stats(self) -> dict:
+        persisted = await db.jobs.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "persisted": {doc["_id"]: doc["count"] for doc in persisted}
+        }
+
+job_queue = JobQueue(JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_SECONDS)
+
+class LRUCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, str, bytes]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, namespace, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def drop(self, namespace: str) -> None:
+        for key in [key for key, (_, entry_namespace, _) in self._entries.items() if entry_namespace == namespace]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCacheBackend:
+    def __init__(self, redis, prefix: str):
+        from redis.exceptions import RedisError
+        self.redis = redis
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.errors = (RedisError, OSError, asyncio.TimeoutError)
+
+    def _warn(self, operation: str, exc: Exception) -> None:
+        logger.warning("Shared cache %s failed: %s", operation, exc)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.redis.get(f"{self.prefix}:cache:{key}")
+        except self.errors as exc:
+            self._warn("get", exc)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        try:
+            await self.redis.set(f"{self.prefix}:cache:{key}", value, px=int(ttl_seconds * 1000))
+        except self.errors as exc:
+            self._warn("set", exc)
+
+    async def acquire(self, key: str, ttl_seconds: float) -> bool:
+        try:
+            return bool(await self.redis.set(f"{self.prefix}:lock:{key}", b"1", nx=True, px=int(ttl_seconds * 1000)))
+        except self.errors as exc:
+            self._warn("lock", exc)
+            return True
+
+    async def release(self, key: str) -> None:
+        try:
+            await self.redis.delete(f"{self.prefix}:lock:{key}")
+        except self.errors as exc:
+            self._warn("unlock", exc)
+
+    async def generations(self, namespaces: List[str]) -> dict:
+        try:
+            values = await self.redis.mget([f"{self.prefix}:gen:{namespace}" for namespace in namespaces])
+        except self.errors as exc:
+            self._warn("generation read", exc)
+            return {}
+        return {namespace: int(value) for namespace, value in zip(namespaces, values) if value is not None}
+
+    async def bump(self, namespace: str) -> Optional[int]:
+        try:
+            return await self.redis.incr(f"{self.prefix}:gen:{namespace}")
+        except self.errors as exc:
+            self._warn("invalidation", exc)
+            return None
+
+    async def publish(self, message: bytes) -> None:
+        try:
+            await self.redis.publish(self.channel, message)
+        except self.errors as exc:
+            self._warn("publish", exc)
+
+    async def listen(self, on_connect, on_message) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                await on_connect()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        on_message(message["data"])
+            except self.errors as exc:
+                self._warn("subscription", exc)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+class ResponseCache:
+    def __init__(self, local: LRUCache, shared: Optional[RedisCacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.generations: dict = {}
+        self._inflight: dict = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{self.generations.get(namespace, 0)}:{key}"
+
+    async def get_or_load(self, namespace: str, key: str, loader) -> bytes:
+        if self.local.ttl_seconds <= 0:
+            return await loader()
+        full_key = self._key(namespace, key)
+        value = self.local.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._load(full_key, loader)
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+        self.local.set(namespace, full_key, value)
+        future.set_result(value)
+        return value
+
+    async def _load(self, full_key: str, loader) -> bytes:
+        if self.shared is None:
+            self.loads += 1
+            return await loader()
+        value = await self.shared.get(full_key)
+        if value is not None:
+            self.shared_hits += 1
+            return value
+        deadline = time.monotonic() + CACHE_LOCK_SECONDS
+        acquired = await self.shared.acquire(full_key, CACHE_LOCK_SECONDS)
+        while not acquired and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            value = await self.shared.get(full_key)
+            if value is not None:
+                self.shared_hits += 1
+                return value
+            acquired = await self.shared.acquire(full_key, CACHE_LOCK_SECONDS)
+        try:
+            self.loads += 1
+            value = await loader()
+            await self.shared.set(full_key, value, self.local.ttl_seconds)
+            return value
+        finally:
+            if acquired:
+                await self.shared.release(full_key)
+
+    def _apply(self, namespace: str, generation: int) -> None:
+        if generation > self.generations.get(namespace, 0):
+            self.generations[namespace] = generation
+            self.local.drop(namespace)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.invalidations += 1
+            generation = await self.shared.bump(namespace) if self.shared is not None else None
+            if generation is None:
+                generation = self.generations.get(namespace, 0) + 1
+            self._apply(namespace, generation)
+            if self.shared is not None:
+                await self.shared.publish(orjson.dumps({"namespace": namespace, "generation": generation}))
+
+    def _on_message(self, data: bytes) -> None:
+        message = orjson.loads(data)
+        self._apply(message["namespace"], message["generation"])
+
+    async def _sync_generations(self) -> None:
+        for namespace, generation in (await self.shared.generations(CACHE_NAMESPACES)).items():
+            self._apply(namespace, generation)
+
+    async def start(self) -> None:
+        if self.shared is not None:
+            self._listener = asyncio.create_task(self.shared.listen(self._sync_generations, self._on_message))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.shared is not None:
+            await self.shared.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if self.shared is not None else "local",
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_seconds": self.local.ttl_seconds,
+            "evictions": self.local.evictions,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "generations": dict(self.generations)
+        }
+
+def create_shared_cache_backend(url: Optional[str]) -> Optional[RedisCacheBackend]:
+    if not url:
+        return None
+    import redis.asyncio as redis_asyncio
+    return RedisCacheBackend(redis_asyncio.from_url(url), CACHE_KEY_PREFIX)
+
+response_cache = ResponseCache(LRUCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS), create_shared_cache_backend(CACHE_REDIS_URL))
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": max(int(time.time()), token_revocations.not_before(data["sub"])), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
-    if not credentials or not credentials.credentials:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    
+def create_stream_ticket(payload: dict) -> str:
+    expire = min(time.time() + CHANGE_FEED_TICKET_SECONDS, payload["exp"])
+    to_encode = {"sub": payload["sub"], "until": payload["exp"], "iat": payload.get("iat", 0), "exp": expire, "type": "stream"}
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def create_refresh_token(email: str, user_id: str, version: int) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": email, "uid": user_id, "ver": version, "exp": expire, "iat": max(int(time.time()), token_revocations.not_before(email)), "type": "refresh"}
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def issue_tokens(user: dict) -> dict:
+    version = user.get("token_version", 0)
+    return {
+        "token": create_access_token({"sub": user["email"], "role": user["role"], "ver": version}),
+        "refresh_token": create_refresh_token(user["email"], str(user["_id"]), version)
+    }
+
+class TokenRevocations:
+    def __init__(self):
+        self._revoked: dict = {}
+        self.last_revoked_at = 0.0
+        self.rejected = 0
+
+    def revoke(self, email: str, revoked_at: float, expires_at: float) -> None:
+        current = self._revoked.get(email)
+        if current is None or current[0] < revoked_at:
+            self._revoked[email] = (revoked_at, expires_at)
+        self.last_revoked_at = max(self.last_revoked_at, revoked_at)
+
+    def not_before(self, email: str) -> int:
+        entry = self._revoked.get(email)
+        return int(entry[0]) + 1 if entry is not None else 0
+
+    def is_revoked(self, email: str, issued_at: float) -> bool:
+        entry = self._revoked.get(email)
+        if entry is None or issued_at > entry[0]:
+            return False
+        self.rejected += 1
+        return True
+
+    def prune(self) -> None:
+        now = time.time()
+        for email in [email for email, (_, expires_at) in self._revoked.items() if expires_at <= now]:
+            del self._revoked[email]
+
+    def stats(self) -> dict:
+        return {"revoked_users": len(self._revoked), "rejected": self.rejected, "last_revoked_at": self.last_revoked_at}
+
+token_revocations = TokenRevocations()
+
+async def revoke_user_tokens(email: str) -> None:
+    await db.users.update_one({"email": email}, {"$inc": {"token_version": 1}})
+    await record_token_revocation(email)
+
+async def record_token_revocation(email: str) -> None:
+    revoked_at = time.time()
+    expires_at = revoked_at + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    token_revocations.revoke(email, revoked_at, expires_at)
+    principal_cache.invalidate(email)
+    await db.token_revocations.insert_one({
+        "email": email,
+        "revoked_at": revoked_at,
+        "expires_at": datetime.fromtimestamp(expires_at, timezone.utc)
+    })
+
+async def sync_token_revocations() -> None:
+    since = token_revocations.last_revoked_at - TOKEN_REVOCATION_CLOCK_SKEW_SECONDS
+    async for doc in db.token_revocations.find({"revoked_at": {"$gt": since}}, {"_id": 0}):
+        expires_at = doc["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+        token_revocations.revoke(doc["email"], doc["revoked_at"], expires_at)
+        principal_cache.invalidate(doc["email"])
+    token_revocations.prune()
+
+async def sync_token_revocations_periodically():
+    while True:
+        await asyncio.sleep(TOKEN_REVOCATION_SYNC_SECONDS)
+        try:
+            await sync_token_revocations()
+        except PyMongoError as exc:
+            logger.error("Token revocation sync failed: %s", exc)
+
+def decode_token(token: str, token_type: str = "access") -> dict:
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], leeway=TOKEN_LEEWAY_SECONDS)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
@@ -98,79 +1297,570 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = await db.users.find_one({"email": email}, {"_id": 0, "password_hash": 0})
+    if payload.get("type", "access") != token_type:
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    if token_revocations.is_revoked(email, payload.get("iat", 0)):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+async def load_user(email: str) -> User:
+    cached = principal_cache.get(email)
+    if cached is not None:
+        return cached
+    return await fetch_user(email)
+
+async def fetch_user(email: str) -> User:
+    user = await db.users.find_one({"email": email}, {"_id": 0, "password_hash": 0, "applied_jobs": 0})
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    principal = User.model_construct(**user)
+    principal_cache.set(email, principal)
+    return principal
 
-async def require_admin(current_user: User = Depends(get_current_user)):
-    if current_user.role not in ["admin", "chief"]:
+async def get_stream_token(
+    ticket: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> dict:
+    if credentials and credentials.credentials:
+        payload = decode_token(credentials.credentials)
+    elif ticket:
+        payload = decode_token(ticket, "stream")
+    else:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    await load_user(payload["sub"])
+    return payload
+
+async def get_token_principal(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Principal:
+    if not credentials or not credentials.credentials:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    payload = decode_token(credentials.credentials)
+    if "role" not in payload:
+        user = await load_user(payload["sub"])
+        return Principal(email=user.email, role=user.role)
+    return Principal(email=payload["sub"], role=payload["role"])
+
+async def require_admin(principal: Principal = Depends(get_token_principal)):
+    if principal.role not in ["admin", "chief"]:
         raise HTTPException(status_code=403, detail="Admin access required")
-    return current_user
+    return principal
 
-async def require_chief(current_user: User = Depends(get_current_user)):
-    if current_user.role != "chief":
+async def require_chief(principal: Principal = Depends(get_token_principal)):
+    if principal.role != "chief":
         raise HTTPException(status_code=403, detail="Chief access required")
-    return current_user
+    return principal
+
+async def increment_stats(**deltas: int) -> None:
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        await db.stats.update_one({"_id": STATS_DOCUMENT_ID}, {"$inc": deltas}, upsert=True)
+        await bump_versions("stats")
+
+async def load_cached_stats() -> bytes:
+    async def load() -> bytes:
+        return orjson.dumps(await read_stats())
+    
+    return await response_cache.get_or_load("stats", STATS_DOCUMENT_ID, load)
+
+async def increment_role_count(role: Optional[str], delta: int) -> None:
+    counter = ROLE_COUNTERS.get(role)
+    if counter:
+        await increment_stats(**{counter: delta})
+
+async def reconcile_stats() -> dict:
+    before = await db.stats.find_one({"_id": STATS_DOCUMENT_ID})
+    totals = {
+        "total_users": await db.users.count_documents({"role": "user"}),
+        "total_events": await db.events.count_documents({}),
+        "total_admins": await db.users.count_documents({"role": "admin"})
+    }
+    if before is None:
+        try:
+            await db.stats.update_one({"_id": STATS_DOCUMENT_ID}, {"$setOnInsert": totals}, upsert=True)
+        except DuplicateKeyError:
+            pass
+        return totals
+    drift = {name: value - before.get(name, 0) for name, value in totals.items() if before.get(name, 0) != value}
+    if drift:
+        unchanged = {name: before[name] if name in before else {"$exists": False} for name in totals}
+        result = await db.stats.update_one({"_id": STATS_DOCUMENT_ID, **unchanged}, {"$inc": drift})
+        if result.modified_count:
+            logger.warning("Repaired stats drift: %s", drift)
+            await bump_versions("stats")
+    return totals
+
+async def read_stats() -> dict:
+    totals = await db.stats.find_one({"_id": STATS_DOCUMENT_ID})
+    if totals is None:
+        return await reconcile_stats()
+    
+    return {
+        "total_users": totals.get("total_users", 0),
+        "total_events": totals.get("total_events", 0),
+        "total_admins": totals.get("total_admins", 0)
+    }
+
+async def reconcile_stats_periodically():
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL_SECONDS)
+        try:
+            await reconcile_stats()
+        except PyMongoError as exc:
+            logger.error("Stats reconciliation failed: %s", exc)
+
+def ranking_score(events_joined_count: int, achievements_count: int) -> int:
+    return events_joined_count * LEADERBOARD_EVENT_POINTS + achievements_count * LEADERBOARD_ACHIEVEMENT_POINTS
+
+async def upsert_rankings(users: List[dict]) -> None:
+    requests = []
+    for user in users:
+        if user.get("role") not in RANKED_ROLES:
+            continue
+        events_joined_count = user.get("events_joined_count", 0)
+        achievements_count = len(user.get("achievements", []))
+        requests.append(UpdateOne({"_id": user["email"]}, {"$set": {
+            "name": user["name"],
+            "events_joined_count": events_joined_count,
+            "achievements_count": achievements_count,
+            "score": ranking_score(events_joined_count, achievements_count)
+        }}, upsert=True))
+    if requests:
+        await db.rankings.bulk_write(requests, ordered=False)
+
+async def apply_once(job_id: ObjectId, step: str, apply) -> None:
+    marker = f"{job_id}:{step}"
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=JOB_APPLIED_TTL_SECONDS)
+    try:
+        await db.applied_jobs.insert_one({"_id": marker, "expires_at": expires_at})
+    except DuplicateKeyError:
+        return
+    try:
+        await apply()
+    except BaseException:
+        await db.applied_jobs.delete_one({"_id": marker})
+        raise
+
+async def increment_rankings(emails: List[str], events: int = 0, achievements: int = 0) -> int:
+    result = await db.rankings.update_many(
+        {"_id": {"$in": emails}},
+        {"$inc": {"events_joined_count": events, "achievements_count": achievements, "score": ranking_score(events, achievements)}}
+    )
+    return result.matched_count
+
+async def record_achievement(email: str, achievement: str) -> None:
+    if await increment_rankings([email], achievements=1):
+        await db.achievement_totals.update_one({"_id": achievement}, {"$inc": {"members": 1}}, upsert=True)
+
+async def remove_ranking(user: dict) -> None:
+    removed = await db.rankings.delete_one({"_id": user["email"]})
+    if removed.deleted_count and user.get("achievements"):
+        await db.achievement_totals.bulk_write(
+            [UpdateOne({"_id": achievement}, {"$inc": {"members": -1}}) for achievement in user["achievements"]], ordered=False
+        )
+        await db.achievement_totals.delete_many({"members": {"$lte": 0}})
+
+async def acquire_lease(name: str, seconds: float) -> Optional[ObjectId]:
+    holder = ObjectId()
+    now = datetime.now(timezone.utc)
+    try:
+        await db.leases.find_one_and_update(
+            {"_id": name, "expires_at": {"$lte": now}},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return None
+    return holder
+
+async def release_lease(name: str, holder: ObjectId) -> None:
+    await db.leases.delete_one({"_id": name, "holder": holder})
+
+async def rebuild_rankings() -> Optional[int]:
+    holder = await acquire_lease("rankings.rebuild", RANKINGS_REBUILD_LEASE_SECONDS)
+    if holder is None:
+        logger.info("Rankings rebuild already running elsewhere, skipping")
+        return None
+    try:
+        return await rebuild_rankings_locked()
+    finally:
+        await release_lease("rankings.rebuild", holder)
+
+async def rebuild_rankings_locked() -> int:
+    pipeline = [
+        {"$match": {"role": {"$in": RANKED_ROLES}}},
+        {"$project": {
+            "_id": "$email",
+            "name": 1,
+            "events_joined_count": {"$ifNull": ["$events_joined_count", 0]},
+            "achievements_count": {"$size": {"$ifNull": ["$achievements", []]}}
+        }},
+        {"$addFields": {"score": {"$add": [
+            {"$multiply": ["$events_joined_count", LEADERBOARD_EVENT_POINTS]},
+            {"$multiply": ["$achievements_count", LEADERBOARD_ACHIEVEMENT_POINTS]}
+        ]}}}
+    ]
+    rebuilt = 0
+    batch = []
+    async for ranking in db.users.aggregate(pipeline):
+        batch.append(UpdateOne({"_id": ranking.pop("_id")}, {"$set": ranking}, upsert=True))
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await db.rankings.bulk_write(batch, ordered=False)
+            rebuilt += len(batch)
+            batch = []
+    if batch:
+        await db.rankings.bulk_write(batch, ordered=False)
+        rebuilt += len(batch)
+    
+    listed = [doc["_id"] async for doc in db.rankings.find({}, {"_id": 1})]
+    ranked = {doc["email"] async for doc in db.users.find({"role": {"$in": RANKED_ROLES}}, {"_id": 0, "email": 1})}
+    orphaned = [email for email in listed if email not in ranked]
+    if orphaned:
+        await db.rankings.delete_many({"_id": {"$in": orphaned}})
+    
+    totals = await db.users.aggregate([
+        {"$match": {"role": {"$in": RANKED_ROLES}}},
+        {"$unwind": "$achievements"},
+        {"$group": {"_id": "$achievements", "members": {"$sum": 1}}}
+    ]).to_list(None)
+    if totals:
+        await db.achievement_totals.bulk_write(
+            [UpdateOne({"_id": total["_id"]}, {"$set": {"members": total["members"]}}, upsert=True) for total in totals],
+            ordered=False
+        )
+    counted = [total["_id"] async for total in db.achievement_totals.find({"_id": {"$nin": [total["_id"] for total in totals]}}, {"_id": 1})]
+    if counted:
+        held = set(await db.users.distinct("achievements", {"role": {"$in": RANKED_ROLES}, "achievements": {"$in": counted}}))
+        await db.achievement_totals.delete_many({"_id": {"$in": [achievement for achievement in counted if achievement not in held]}})
+    logger.info("Rebuilt %d rankings and %d achievement totals", rebuilt, len(totals))
+    return rebuilt
+
+async def ensure_rankings() -> None:
+    ranked = await db.users.count_documents({"role": {"$in": RANKED_ROLES}})
+    if await db.rankings.count_documents({}) != ranked:
+        await rebuild_rankings()
+
+async def bump_versions(*collections: str) -> None:
+    await db.versions.bulk_write(
+        [UpdateOne({"_id": name}, {"$inc": {"version": 1}}, upsert=True) for name in collections],
+        ordered=False
+    )
+    await response_cache.invalidate(*collections)
+
+async def read_versions(*collections: str) -> dict:
+    versions = {doc["_id"]: doc.get("version", 0) async for doc in db.versions.find({"_id": {"$in": list(collections)}})}
+    return {name: versions.get(name, 0) for name in collections}
+
+async def check_not_modified(request: Request, response: Response, collections: List[str], vary: str = "") -> Optional[Response]:
+    return not_modified_for(request, response, await read_versions(*collections), vary)
+
+def not_modified_for(request: Request, response: Response, versions: dict, vary: str = "") -> Optional[Response]:
+    fingerprint = f"{request.url.path}?{request.url.query}|{vary}|{sorted(versions.items())}"
+    etag = '"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def hydrate_memberships(events: List[dict], with_members: bool = True) -> List[dict]:
+    by_id = {}
+    for event in events:
+        event_id = event.pop("_id")
+        event["id"] = str(event_id)
+        if with_members:
+            for field in MEMBERSHIP_FIELDS.values():
+                event[field] = []
+            by_id[event_id] = event
+    if by_id:
+        async for membership in db.memberships.find(
+            {"event_id": {"$in": list(by_id)}}, {"_id": 0, "event_id": 1, "kind": 1, "email": 1}
+        ):
+            by_id[membership["event_id"]][MEMBERSHIP_FIELDS[membership["kind"]]].append(membership["email"])
+    return events
+
+async def query_events_page(
+    query: dict, fields: Optional[str], limit: int, after: Optional[str] = None, by_date: bool = False
+) -> tuple[List[dict], Optional[str]]:
+    projection = build_projection(fields, EVENT_FIELDS)
+    requested = set(projection) - {"_id"}
+    for field in [*MEMBERSHIP_FIELDS.values(), "id"]:
+        projection.pop(field, None)
+    if by_date:
+        projection["date"] = 1
+    docs, next_cursor = await query_page(db.events, query, projection, limit, after, strip_id=False, by_date=by_date)
+    await hydrate_memberships(docs, with_members=any(field in requested for field in MEMBERSHIP_FIELDS.values()))
+    if fields:
+        docs = [{key: value for key, value in doc.items() if key in requested} for doc in docs]
+    return docs, next_cursor
+
+def parse_event_id(event_id: str) -> ObjectId:
+    try:
+        return ObjectId(event_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Event not found")
+
+async def resolve_event_id(event_name: str) -> ObjectId:
+    event = await db.events.find_one({"event_name": event_name}, {"_id": 1})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event["_id"]
+
+async def member_event_ids(email: str, kind: str) -> List[ObjectId]:
+    return await db.memberships.distinct("event_id", {"email": email, "kind": kind})
+
+async def insert_membership(event_id: ObjectId, email: str, kind: str, session=None) -> bool:
+    try:
+        await db.memberships.insert_one({"event_id": event_id, "email": email, "kind": kind}, session=session)
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def delete_membership(event_id: ObjectId, email: str, kind: str) -> None:
+    await db.memberships.delete_one({"event_id": event_id, "email": email, "kind": kind})
+
+def date_range(date_from: Optional[datetime], date_to: Optional[datetime]) -> dict:
+    bounds = {}
+    if date_from:
+        bounds["$gte"] = date_from
+    if date_to:
+        bounds["$lte"] = date_to
+    return {"date": bounds} if bounds else {}
+
+async def migrate_event_dates() -> int:
+    migrated = 0
+    unparseable = 0
+    async for event in db.events.find({"date": {"$type": "string"}}, {"_id": 1, "date": 1}):
+        try:
+            parsed = date_parser.parse(event["date"])
+        except (ValueError, OverflowError):
+            unparseable += 1
+            continue
+        await db.events.update_one({"_id": event["_id"], "date": event["date"]}, {"$set": {"date": parsed}})
+        migrated += 1
+    if migrated:
+        await bump_versions("events")
+        logger.info("Converted %d event dates to datetimes", migrated)
+    if unparseable:
+        logger.warning("%d events have free-form dates that could not be parsed", unparseable)
+    return migrated
+
+async def migrate_embedded_memberships() -> int:
+    fields = list(MEMBERSHIP_FIELDS.values())
+    query = {"$or": [{field: {"$exists": True}} for field in fields]}
+    migrated = 0
+    async for event in db.events.find(query, {"_id": 1, **{field: 1 for field in fields}}):
+        memberships = [
+            {"event_id": event["_id"], "email": email, "kind": kind}
+            for kind, field in MEMBERSHIP_FIELDS.items()
+            for email in dict.fromkeys(event.get(field) or [])
+        ]
+        if memberships:
+            try:
+                await db.memberships.insert_many(memberships, ordered=False)
+            except BulkWriteError as exc:
+                if any(error.get("code") != 11000 for error in exc.details.get("writeErrors", [])):
+                    raise
+        await db.events.update_one({"_id": event["_id"]}, {"$unset": {field: "" for field in fields}})
+        migrated += 1
+    if migrated:
+        await bump_versions("events")
+        logger.info("Migrated embedded memberships of %d events", migrated)
+    return migrated
+
+async def migrate_membership_event_ids() -> int:
+    migrated = 0
+    for event_name in await db.memberships.distinct("event_name", {"event_id": {"$exists": False}}):
+        legacy = {"event_name": event_name, "event_id": {"$exists": False}}
+        event = await db.events.find_one({"event_name": event_name}, {"_id": 1})
+        if event is None:
+            await db.memberships.delete_many(legacy)
+            continue
+        result = await db.memberships.update_many(legacy, {"$set": {"event_id": event["_id"]}, "$unset": {"event_name": ""}})
+        migrated += result.modified_count
+    if migrated:
+        logger.info("Re-keyed %d memberships by event id", migrated)
+    return migrated
 
 @api_router.post("/auth/register", response_model=UserWithToken)
-async def register(user_data: UserCreate, chief: User = Depends(require_chief)):
+async def register(user_data: UserCreate, chief: Principal = Depends(require_chief)):
     existing = await db.users.find_one({"email": user_data.email})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_dict = user_data.model_dump()
     password = user_dict.pop("password")
-    user_dict["password_hash"] = hash_password(password)
+    user_dict["password_hash"] = await hash_password(password)
     user_dict["events_joined_count"] = 0
     user_dict["achievements"] = []
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await increment_role_count(user_dict["role"], 1)
+    await upsert_rankings([user_dict])
+    await bump_versions("users")
     
-    token = create_access_token({"sub": user_data.email})
     user = User(**{k: v for k, v in user_dict.items() if k != "password_hash"})
-    return UserWithToken(**user.model_dump(), token=token)
+    return UserWithToken(**user.model_dump(), **issue_tokens(user_dict))
 
 @api_router.post("/auth/login", response_model=UserWithToken)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, request: Request):
+    email = credentials.email.lower()
+    await login_throttle.check(client_ip(request), email)
     user = await db.users.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    if not user or not await verify_password(credentials.password, user["password_hash"]):
+        await login_throttle.failed(email)
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    await login_throttle.succeeded(email)
     
-    token = create_access_token({"sub": credentials.email})
     user_data = {k: v for k, v in user.items() if k not in ["_id", "password_hash"]}
     user_obj = User(**user_data)
-    return UserWithToken(**user_obj.model_dump(), token=token)
+    return UserWithToken(**user_obj.model_dump(), **issue_tokens(user))
+
+@api_router.post("/auth/refresh", response_model=TokenPair)
+async def refresh_tokens(body: RefreshRequest):
+    payload = decode_token(body.refresh_token, "refresh")
+    user = await db.users.find_one({"email": payload["sub"]}, {"_id": 1, "email": 1, "role": 1, "token_version": 1})
+    if user is None or str(user["_id"]) != payload.get("uid") or user.get("token_version", 0) != payload.get("ver"):
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+    return issue_tokens(user)
+
+@api_router.post("/auth/logout")
+async def logout(principal: Principal = Depends(get_token_principal)):
+    await revoke_user_tokens(principal.email)
+    return {"message": "Logged out"}
 
 @api_router.get("/users/me", response_model=User)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_current_user_profile(request: Request, response: Response, principal: Principal = Depends(get_token_principal)):
+    not_modified = await check_not_modified(request, response, ["users"], principal.email)
+    if not_modified:
+        return not_modified
+    current_user = await fetch_user(principal.email)
+    return trusted_json(current_user.model_dump(), response)
 
-@api_router.get("/users", response_model=List[User])
-async def get_all_users(current_user: User = Depends(get_current_user)):
-    if current_user.role not in ["admin", "chief"]:
+@api_router.get("/users/me/events")
+async def get_my_events(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_token_principal)
+):
+    not_modified = await check_not_modified(request, response, ["events"], current_user.email)
+    if not_modified:
+        return not_modified
+    event_ids = await member_event_ids(current_user.email, "assigned")
+    docs, next_cursor = await query_events_page({"_id": {"$in": event_ids}}, fields, limit, after)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return trusted_json(docs, response)
+
+@api_router.get("/users")
+async def get_all_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    role: Optional[str] = None,
+    principal: Principal = Depends(get_token_principal)
+):
+    if principal.role not in ["admin", "chief"]:
         raise HTTPException(status_code=403, detail="Admin or Chief access required")
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    return [User(**u) for u in users]
+    not_modified = await check_not_modified(request, response, ["users"])
+    if not_modified:
+        return not_modified
+    query = {"role": role} if role else {}
+    projection = build_projection(fields, USER_FIELDS)
+    return await cached_page(request, response, "users", lambda: query_page(db.users, query, projection, limit, after))
+
+@api_router.get("/users/export")
+async def export_users(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    role: Optional[str] = None,
+    admin: Principal = Depends(require_admin)
+):
+    query = {"role": role} if role else {}
+    return stream_export(db.users, query, list(User.model_fields), export_format, "users")
 
 @api_router.post("/users", response_model=User)
-async def create_user(user_data: UserCreate, chief: User = Depends(require_chief)):
+async def create_user(user_data: UserCreate, chief: Principal = Depends(require_chief)):
     existing = await db.users.find_one({"email": user_data.email})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_dict = user_data.model_dump()
     password = user_dict.pop("password")
-    user_dict["password_hash"] = hash_password(password)
+    user_dict["password_hash"] = await hash_password(password)
     user_dict["events_joined_count"] = 0
     user_dict["achievements"] = []
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await increment_role_count(user_dict["role"], 1)
+    await upsert_rankings([user_dict])
+    await bump_versions("users")
     user = User(**{k: v for k, v in user_dict.items() if k != "password_hash"})
     return user
 
+@api_router.post("/users/bulk", response_model=BulkResult)
+async def create_users_bulk(batch: BulkUserCreate, chief: Principal = Depends(require_chief)):
+    emails = [user_data.email for user_data in batch.users]
+    existing = {doc["email"] async for doc in db.users.find({"email": {"$in": emails}}, {"_id": 0, "email": 1})}
+    errors = {index: "Email already registered" for index, email in enumerate(emails) if email in existing}
+    hashing_slots = asyncio.Semaphore(max(1, password_hasher.max_concurrency // 2))
+    
+    async def hash_row(index: int, password: str) -> Optional[str]:
+        async with hashing_slots:
+            try:
+                return await hash_password(password)
+            except HTTPException as exc:
+                errors[index] = exc.detail
+                return None
+    
+    pending = [index for index in range(len(batch.users)) if index not in errors]
+    password_hashes = await asyncio.gather(*(hash_row(index, batch.users[index].password) for index in pending))
+    rows = {}
+    for index, password_hash in zip(pending, password_hashes):
+        if password_hash is None:
+            continue
+        user_dict = batch.users[index].model_dump(exclude={"password"})
+        user_dict["password_hash"] = password_hash
+        user_dict["events_joined_count"] = 0
+        user_dict["achievements"] = []
+        rows[index] = user_dict
+    
+    row_indexes = list(rows)
+    if rows:
+        try:
+            await db.users.insert_many(list(rows.values()), ordered=False)
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                errors[row_indexes[error["index"]]] = "Email already registered" if error.get("code") == 11000 else error.get("errmsg", "Write failed")
+    
+    results = []
+    role_deltas = {}
+    for index, user_data in enumerate(batch.users):
+        if index in errors:
+            results.append(BulkRowResult(index=index, email=user_data.email, status="failed", detail=errors[index]))
+            continue
+        results.append(BulkRowResult(index=index, email=user_data.email, status="created"))
+        counter = ROLE_COUNTERS.get(user_data.role)
+        if counter:
+            role_deltas[counter] = role_deltas.get(counter, 0) + 1
+    await increment_stats(**role_deltas)
+    await upsert_rankings([rows[index] for index in row_indexes if index not in errors])
+    if len(errors) < len(batch.users):
+        await bump_versions("users")
+    
+    return BulkResult(succeeded=len(batch.users) - len(errors), failed=len(errors), results=results)
+
 @api_router.delete("/users/{user_email}")
-async def delete_user(user_email: str, chief: User = Depends(require_chief)):
+async def delete_user(user_email: str, chief: Principal = Depends(require_chief)):
     user = await db.users.find_one({"email": user_email})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -178,99 +1868,565 @@ async def delete_user(user_email: str, chief: User = Depends(require_chief)):
     if user.get("role") == "chief":
         raise HTTPException(status_code=403, detail="Cannot delete chief account")
     
-    await db.users.delete_one({"email": user_email})
-    await db.events.update_many({}, {"$pull": {"users_assigned": user_email, "admins_joined": user_email}})
+    result = await db.users.delete_one({"email": user_email})
+    await record_token_revocation(user_email)
+    await job_queue.enqueue("user.cleanup", {
+        "email": user_email,
+        "role": user.get("role"),
+        "achievements": user.get("achievements", []),
+        "deleted": bool(result.deleted_count)
+    })
     
     return {"message": "User deleted successfully"}
 
+@job_queue.handler("user.cleanup")
+async def cleanup_deleted_user(job: dict) -> None:
+    user = job["payload"]
+    if user.get("deleted"):
+        await apply_once(job["_id"], "stats", lambda: increment_role_count(user["role"], -1))
+        await remove_ranking(user)
+    await db.memberships.delete_many({"email": user["email"]})
+    await bump_versions("users", "events")
+
 @api_router.post("/users/{user_email}/achievements")
-async def add_achievement(user_email: str, achievement_data: AchievementAdd, admin: User = Depends(require_admin)):
+async def add_achievement(user_email: str, achievement_data: AchievementAdd, admin: Principal = Depends(require_admin)):
     user = await db.users.find_one({"email": user_email})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    await db.users.update_one(
+    result = await db.users.update_one(
         {"email": user_email},
         {"$addToSet": {"achievements": achievement_data.achievement}}
     )
+    if result.modified_count:
+        await record_achievement(user_email, achievement_data.achievement)
+    principal_cache.invalidate(user_email)
+    await bump_versions("users")
+    change_feed.publish("achievement.added", {"email": user_email, "achievement": achievement_data.achievement})
     return {"message": "Achievement added successfully"}
 
 @api_router.post("/events", response_model=Event)
-async def create_event(event_data: EventBase, admin: User = Depends(require_admin)):
+async def create_event(event_data: EventBase, admin: Principal = Depends(require_admin)):
     event_dict = event_data.model_dump()
     event_dict["created_by"] = admin.email
-    event_dict["admins_joined"] = []
-    event_dict["users_assigned"] = []
     
-    await db.events.insert_one(event_dict)
-    return Event(**event_dict)
+    try:
+        await db.events.insert_one(event_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Event name already exists")
+    event_dict["id"] = str(event_dict.pop("_id"))
+    await increment_stats(total_events=1)
+    await bump_versions("events")
+    event = Event(**event_dict)
+    change_feed.publish("event.created", event.model_dump())
+    return event
 
-@api_router.get("/events", response_model=List[Event])
-async def get_events(current_user: User = Depends(get_current_user)):
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
-    return [Event(**e) for e in events]
+@api_router.get("/events")
+async def get_events(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    created_by: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    joined_by: Optional[str] = None,
+    current_user: Principal = Depends(get_token_principal)
+):
+    not_modified = await check_not_modified(request, response, ["events"])
+    if not_modified:
+        return not_modified
+    query = {}
+    member_filters = [(email, kind) for email, kind in [(assigned_to, "assigned"), (joined_by, "joined")] if email]
+    if member_filters:
+        event_ids = None
+        for email, kind in member_filters:
+            matched = set(await member_event_ids(email, kind))
+            event_ids = matched if event_ids is None else event_ids & matched
+        query["_id"] = {"$in": sorted(event_ids)}
+    query.update(date_range(date_from, date_to))
+    if created_by:
+        query["created_by"] = created_by
+    by_date = date_from is not None or date_to is not None
+    return await cached_page(request, response, "events", lambda: query_events_page(query, fields, limit, after, by_date))
 
-@api_router.delete("/events/{event_name}")
-async def delete_event(event_name: str, admin: User = Depends(require_admin)):
-    event = await db.events.find_one({"event_name": event_name})
+@api_router.get("/events/search")
+async def search_events(
+    q: Optional[str] = Query(None, min_length=1),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    upcoming: bool = False,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_LIMIT),
+    current_user: Principal = Depends(get_token_principal)
+):
+    if upcoming and date_from is None:
+        date_from = datetime.now(timezone.utc)
+    query = date_range(date_from, date_to)
+    projection = {"_id": 1, **{field: 1 for field in EVENT_FIELDS if field not in [*MEMBERSHIP_FIELDS.values(), "id"]}}
+    if q:
+        query["$text"] = {"$search": q}
+        projection["score"] = {"$meta": "textScore"}
+        cursor = db.events.find(query, projection).sort([("score", {"$meta": "textScore"})])
+    else:
+        cursor = db.events.find(query, projection).sort([("date", ASCENDING), ("_id", ASCENDING)])
+    docs = await cursor.limit(limit).to_list(limit)
+    for doc in docs:
+        doc.pop("score", None)
+    return ORJSONResponse(await hydrate_memberships(docs))
+
+@api_router.get("/events/export")
+async def export_events(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    admin: Principal = Depends(require_admin)
+):
+    return stream_export(db.events, {}, list(Event.model_fields), export_format, "events", hydrate_memberships)
+
+@api_router.get("/events/archive")
+async def get_archived_events(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    deleted: Optional[bool] = None,
+    current_user: Principal = Depends(get_token_principal)
+):
+    not_modified = await check_not_modified(request, response, ["events"])
+    if not_modified:
+        return not_modified
+    query = date_range(date_from, date_to)
+    if deleted is not None:
+        query["deleted_at"] = {"$exists": deleted}
+    by_date = date_from is not None or date_to is not None
+    projection = build_projection(fields, ARCHIVED_EVENT_FIELDS)
+    include_id = "id" in projection
+    include_date = "date" in projection
+    projection.pop("id", None)
+    if by_date:
+        projection["date"] = 1
+    docs, next_cursor = await query_page(db.events_archive, query, projection, limit, after, strip_id=False, by_date=by_date)
+    for doc in docs:
+        event_id = doc.pop("_id")
+        if include_id:
+            doc["id"] = str(event_id)
+        if not include_date:
+            doc.pop("date", None)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return trusted_json(docs, response)
+
+async def archive_events(events: List[dict], **marks) -> int:
+    event_ids = [event["_id"] for event in events]
+    members = {event_id: {field: [] for field in MEMBERSHIP_FIELDS.values()} for event_id in event_ids}
+    async for membership in db.memberships.find(
+        {"event_id": {"$in": event_ids}}, {"_id": 0, "event_id": 1, "kind": 1, "email": 1}
+    ):
+        members[membership["event_id"]][MEMBERSHIP_FIELDS[membership["kind"]]].append(membership["email"])
+    archived_at = datetime.now(timezone.utc)
+    await db.events_archive.bulk_write([
+        UpdateOne(
+            {"_id": event["_id"]},
+            {"$setOnInsert": {
+                **{k: v for k, v in event.items() if k != "_id"},
+                **members[event["_id"]],
+                "archived_at": archived_at,
+                **marks
+            }},
+            upsert=True
+        )
+        for event in events
+    ], ordered=False)
+    await db.memberships.delete_many({"event_id": {"$in": event_ids}})
+    result = await db.events.delete_many({"_id": {"$in": event_ids}})
+    if result.deleted_count:
+        await increment_stats(total_events=-result.deleted_count)
+        await bump_versions("events")
+    return result.deleted_count
+
+async def archive_past_events() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ARCHIVE_AFTER_DAYS)
+    archived = 0
+    while True:
+        batch = await db.events.find({"date": {"$lt": cutoff}}).sort("date", ASCENDING).limit(ARCHIVE_BATCH_SIZE).to_list(ARCHIVE_BATCH_SIZE)
+        if not batch:
+            break
+        archived += await archive_events(batch)
+        if len(batch) < ARCHIVE_BATCH_SIZE:
+            break
+    if archived:
+        logger.info("Archived %d events dated before %s", archived, cutoff.isoformat())
+        change_feed.publish("events.archived", {"count": archived, "before": cutoff.isoformat()})
+    return archived
+
+async def archive_past_events_periodically():
+    while True:
+        try:
+            await archive_past_events()
+        except PyMongoError as exc:
+            logger.error("Event archival failed: %s", exc)
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+async def remove_event(event_filter: dict, admin: Principal) -> dict:
+    event = await db.events.find_one(event_filter)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    await db.events.delete_one({"event_name": event_name})
+    await archive_events([event], deleted_at=datetime.now(timezone.utc), deleted_by=admin.email)
+    change_feed.publish("event.deleted", {"event_id": str(event["_id"]), "event_name": event["event_name"]})
     return {"message": "Event deleted successfully"}
 
+@api_router.delete("/events/id/{event_id}")
+async def delete_event_by_id(event_id: str, admin: Principal = Depends(require_admin)):
+    return await remove_event({"_id": parse_event_id(event_id)}, admin)
+
+@api_router.delete("/events/{event_name}")
+async def delete_event(event_name: str, admin: Principal = Depends(require_admin)):
+    return await remove_event({"event_name": event_name}, admin)
+
+async def assign_user(event_id: ObjectId, user_email: str, session=None) -> None:
+    event_lookup = db.events.count_documents({"_id": event_id}, limit=1, session=session)
+    user_lookup = db.users.count_documents({"email": user_email}, limit=1, session=session)
+    membership_insert = insert_membership(event_id, user_email, "assigned", session)
+    if session is None:
+        event_exists, user_exists, inserted = await asyncio.gather(event_lookup, user_lookup, membership_insert)
+    else:
+        event_exists = await event_lookup
+        user_exists = await user_lookup
+        inserted = await membership_insert
+    if not event_exists or not user_exists:
+        if inserted and session is None:
+            await delete_membership(event_id, user_email, "assigned")
+        raise HTTPException(status_code=404, detail="Event not found" if not event_exists else "User not found")
+    if not inserted:
+        raise HTTPException(status_code=400, detail="User already assigned to this event")
+
+@job_queue.handler("assignment.counters")
+async def count_assignments(job: dict) -> None:
+    emails = job["payload"]["emails"]
+    await apply_once(job["_id"], "users", lambda: db.users.update_many({"email": {"$in": emails}}, {"$inc": {"events_joined_count": 1}}))
+    await apply_once(job["_id"], "rankings", lambda: increment_rankings(emails, events=1))
+    for email in emails:
+        principal_cache.invalidate(email)
+    await bump_versions("users", "events")
+
+async def perform_assignment(event_id: ObjectId, user_email: str) -> dict:
+    if ASSIGNMENT_TRANSACTIONS:
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                await assign_user(event_id, user_email, session)
+    else:
+        await assign_user(event_id, user_email)
+    await job_queue.enqueue("assignment.counters", {"emails": [user_email]})
+    change_feed.publish("membership.assigned", {"event_id": str(event_id), "emails": [user_email]})
+    
+    return {"message": "User assigned to event successfully"}
+
+@api_router.post("/events/id/{event_id}/assign-user")
+async def assign_user_to_event_by_id(event_id: str, user_email: str, admin: Principal = Depends(require_admin)):
+    return await perform_assignment(parse_event_id(event_id), user_email)
+
 @api_router.post("/events/{event_name}/assign-user")
-async def assign_user_to_event(event_name: str, user_email: str, admin: User = Depends(require_admin)):
-    event = await db.events.find_one({"event_name": event_name})
-    if not event:
+async def assign_user_to_event(event_name: str, user_email: str, admin: Principal = Depends(require_admin)):
+    return await perform_assignment(await resolve_event_id(event_name), user_email)
+
+async def perform_bulk_assignment(event_id: ObjectId, batch: BulkAssign) -> BulkResult:
+    users = await db.users.find({"email": {"$in": batch.user_emails}}, {"_id": 0, "email": 1}).to_list(None)
+    existing = {u["email"] for u in users}
+    if not await db.events.count_documents({"_id": event_id}, limit=1):
         raise HTTPException(status_code=404, detail="Event not found")
     
-    if user_email in event.get("users_assigned", []):
-        raise HTTPException(status_code=400, detail="User already assigned to this event")
+    candidates = [email for email in dict.fromkeys(batch.user_emails) if email in existing]
+    already_assigned = set()
+    if candidates:
+        try:
+            await db.memberships.insert_many(
+                [{"event_id": event_id, "email": email, "kind": "assigned"} for email in candidates],
+                ordered=False
+            )
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                if error.get("code") != 11000:
+                    raise
+                already_assigned.add(candidates[error["index"]])
+    newly_assigned = set(candidates) - already_assigned
+    if newly_assigned:
+        await job_queue.enqueue("assignment.counters", {"emails": sorted(newly_assigned)})
+        change_feed.publish("membership.assigned", {"event_id": str(event_id), "emails": sorted(newly_assigned)})
     
-    user = await db.users.find_one({"email": user_email})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    results = []
+    seen = set()
+    for index, email in enumerate(batch.user_emails):
+        if email not in existing:
+            results.append(BulkRowResult(index=index, email=email, status="failed", detail="User not found"))
+        elif email in already_assigned or email in seen:
+            results.append(BulkRowResult(index=index, email=email, status="failed", detail="User already assigned to this event"))
+        else:
+            results.append(BulkRowResult(index=index, email=email, status="assigned"))
+        seen.add(email)
+    succeeded = sum(1 for r in results if r.status == "assigned")
     
-    await db.events.update_one(
-        {"event_name": event_name},
-        {"$addToSet": {"users_assigned": user_email}}
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+@api_router.post("/events/id/{event_id}/assign-users", response_model=BulkResult)
+async def assign_users_to_event_by_id_bulk(event_id: str, batch: BulkAssign, admin: Principal = Depends(require_admin)):
+    return await perform_bulk_assignment(parse_event_id(event_id), batch)
+
+@api_router.post("/events/{event_name}/assign-users", response_model=BulkResult)
+async def assign_users_to_event_bulk(event_name: str, batch: BulkAssign, admin: Principal = Depends(require_admin)):
+    return await perform_bulk_assignment(await resolve_event_id(event_name), batch)
+
+async def perform_join(event_id: ObjectId, admin: Principal) -> dict:
+    event_exists, inserted = await asyncio.gather(
+        db.events.count_documents({"_id": event_id}, limit=1),
+        insert_membership(event_id, admin.email, "joined")
     )
+    if not event_exists:
+        if inserted:
+            await delete_membership(event_id, admin.email, "joined")
+        raise HTTPException(status_code=404, detail="Event not found")
+    if not inserted:
+        raise HTTPException(status_code=400, detail="Already joined this event")
+    await bump_versions("events")
+    change_feed.publish("membership.joined", {"event_id": str(event_id), "emails": [admin.email]})
     
-    await db.users.update_one(
-        {"email": user_email},
-        {"$inc": {"events_joined_count": 1}}
+    return {"message": "Joined event successfully"}
+
+@api_router.post("/events/id/{event_id}/join")
+async def join_event_as_admin_by_id(event_id: str, admin: Principal = Depends(require_admin)):
+    return await perform_join(parse_event_id(event_id), admin)
+
+@api_router.post("/events/{event_name}/join")
+async def join_event_as_admin(event_name: str, admin: Principal = Depends(require_admin)):
+    return await perform_join(await resolve_event_id(event_name), admin)
+
+@api_router.get("/stats")
+async def get_stats(admin: Principal = Depends(require_admin)):
+    return Response(await load_cached_stats(), media_type="application/json")
+
+@api_router.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    response: Response,
+    limit: int = Query(LEADERBOARD_DEFAULT_LIMIT, ge=1, le=LEADERBOARD_MAX_LIMIT),
+    principal: Principal = Depends(get_token_principal)
+):
+    not_modified = await check_not_modified(request, response, ["users"])
+    if not_modified:
+        return not_modified
+    docs = await db.rankings.find({}, RANKING_FIELDS).sort([("score", DESCENDING), ("_id", ASCENDING)]).limit(limit).to_list(limit)
+    rank = 0
+    for position, doc in enumerate(docs, start=1):
+        if position == 1 or doc["score"] != docs[position - 2]["score"]:
+            rank = position
+        doc["rank"] = rank
+        doc["email"] = doc.pop("_id")
+    return trusted_json(docs, response)
+
+@api_router.get("/leaderboard/me")
+async def get_my_rank(request: Request, response: Response, principal: Principal = Depends(get_token_principal)):
+    not_modified = await check_not_modified(request, response, ["users"], principal.email)
+    if not_modified:
+        return not_modified
+    ranking = await db.rankings.find_one({"_id": principal.email}, RANKING_FIELDS)
+    if ranking is None:
+        raise HTTPException(status_code=404, detail="Only members are ranked")
+    ahead, total = await asyncio.gather(
+        db.rankings.count_documents({"score": {"$gt": ranking["score"]}}),
+        db.rankings.estimated_document_count()
+    )
+    ranking["email"] = ranking.pop("_id")
+    return trusted_json({**ranking, "rank": ahead + 1, "total": total}, response)
+
+@api_router.get("/achievements/distribution")
+async def get_achievement_distribution(request: Request, response: Response, principal: Principal = Depends(get_token_principal)):
+    not_modified = await check_not_modified(request, response, ["users"])
+    if not_modified:
+        return not_modified
+    achievements, by_count, total = await asyncio.gather(
+        db.achievement_totals.find().sort([("members", DESCENDING), ("_id", ASCENDING)]).to_list(None),
+        db.rankings.aggregate([
+            {"$group": {"_id": "$achievements_count", "members": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ]).to_list(None),
+        db.rankings.estimated_document_count()
     )
+    return trusted_json({
+        "total_members": total,
+        "achievements": [{"achievement": doc["_id"], "members": doc["members"]} for doc in achievements],
+        "members_by_achievement_count": [{"achievements": doc["_id"], "members": doc["members"]} for doc in by_count]
+    }, response)
+
+@api_router.get("/dashboard")
+async def get_dashboard(request: Request, response: Response, principal: Principal = Depends(get_token_principal)):
+    versions = await read_versions("users", "events", "stats")
+    not_modified = not_modified_for(request, response, versions, principal.email)
+    if not_modified:
+        return not_modified
+    current_user = await fetch_user(principal.email)
+    payload = {"role": current_user.role, "user": current_user.model_dump()}
+    if current_user.role not in ["admin", "chief"]:
+        async def load_assigned():
+            event_ids = await member_event_ids(current_user.email, "assigned")
+            return await query_events_page({"_id": {"$in": event_ids}}, None, DEFAULT_PAGE_LIMIT)
+        events_cursor, events = await load_cached_page("events", f"dashboard:{versions['events']}:{current_user.email}", load_assigned)
+        payload.update({"events": orjson.Fragment(events), "events_next_cursor": events_cursor})
+        return ORJSONResponse(payload, headers=dict(response.headers))
     
-    return {"message": "User assigned to event successfully"}
+    events_page = load_cached_page("events", f"dashboard:{versions['events']}", lambda: query_events_page({}, None, DEFAULT_PAGE_LIMIT))
+    users_page = load_cached_page(
+        "users", f"dashboard:{versions['users']}",
+        lambda: query_page(db.users, {}, build_projection(None, USER_FIELDS), DEFAULT_PAGE_LIMIT)
+    )
+    stats, (users_cursor, users), (events_cursor, events) = await asyncio.gather(load_cached_stats(), users_page, events_page)
+    payload.update({
+        "stats": orjson.Fragment(stats),
+        "users": orjson.Fragment(users),
+        "users_next_cursor": users_cursor,
+        "events": orjson.Fragment(events),
+        "events_next_cursor": events_cursor
+    })
+    return ORJSONResponse(payload, headers=dict(response.headers))
 
-@api_router.post("/events/{event_name}/join")
-async def join_event_as_admin(event_name: str, admin: User = Depends(require_admin)):
-    event = await db.events.find_one({"event_name": event_name})
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
+@api_router.post("/changes/ticket")
+async def create_change_feed_ticket(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+    if not credentials or not credentials.credentials:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    payload = decode_token(credentials.credentials)
+    await load_user(payload["sub"])
+    return {"ticket": create_stream_ticket(payload), "expires_in": CHANGE_FEED_TICKET_SECONDS}
+
+@api_router.get("/changes/stream")
+async def stream_changes(request: Request, payload: dict = Depends(get_stream_token)):
+    queue = change_feed.subscribe()
+    expires_at = payload.get("until", payload["exp"])
     
-    if admin.email in event.get("admins_joined", []):
-        raise HTTPException(status_code=400, detail="Already joined this event")
+    async def frames():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                remaining = expires_at - time.time()
+                if remaining <= 0 or token_revocations.is_revoked(payload["sub"], payload.get("iat", 0)):
+                    yield "event: reauthenticate\ndata: {}\n\n"
+                    break
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=min(CHANGE_FEED_HEARTBEAT_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    frame = ": keep-alive\n\n"
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            change_feed.unsubscribe(queue)
     
-    await db.events.update_one(
-        {"event_name": event_name},
-        {"$addToSet": {"admins_joined": admin.email}}
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    
-    return {"message": "Joined event successfully"}
 
-@api_router.get("/stats")
-async def get_stats(admin: User = Depends(require_admin)):
-    total_users = await db.users.count_documents({"role": "user"})
-    total_events = await db.events.count_documents({})
-    total_admins = await db.users.count_documents({"role": "admin"})
-    
-    return {
-        "total_users": total_users,
-        "total_events": total_events,
-        "total_admins": total_admins
-    }
+@api_router.get("/admin/change-feed")
+async def get_change_feed_stats(admin: Principal = Depends(require_admin)):
+    return change_feed.stats()
+
+@api_router.get("/admin/indexes")
+async def get_index_stats(admin: Principal = Depends(require_admin)):
+    report = {}
+    for collection_name in INDEXES:
+        collection = db[collection_name]
+        indexes = await collection.index_information()
+        try:
+            usage = {
+                stat["name"]: {"ops": stat["accesses"]["ops"], "since": stat["accesses"]["since"]}
+                async for stat in collection.aggregate([{"$indexStats": {}}])
+            }
+        except OperationFailure:
+            usage = {}
+        report[collection_name] = [
+            {
+                "name": name,
+                "key": info["key"],
+                "unique": info.get("unique", False),
+                "usage": usage.get(name)
+            }
+            for name, info in indexes.items()
+        ]
+    return report
+
+@api_router.get("/admin/principal-cache")
+async def get_principal_cache_stats(admin: Principal = Depends(require_admin)):
+    return principal_cache.stats()
+
+@api_router.post("/admin/archive-events")
+async def run_event_archival(admin: Principal = Depends(require_admin)):
+    return {"archived": await archive_past_events()}
+
+@api_router.get("/admin/cache")
+async def get_cache_stats(admin: Principal = Depends(require_admin)):
+    return response_cache.stats()
+
+@api_router.get("/admin/jobs")
+async def get_job_stats(admin: Principal = Depends(require_admin)):
+    return await job_queue.stats()
+
+@api_router.get("/admin/token-revocations")
+async def get_token_revocation_stats(admin: Principal = Depends(require_admin)):
+    return token_revocations.stats()
+
+@api_router.get("/admin/login-throttle")
+async def get_login_throttle_stats(admin: Principal = Depends(require_admin)):
+    return login_throttle.stats()
+
+@api_router.get("/admin/password-hasher")
+async def get_password_hasher_stats(admin: Principal = Depends(require_admin)):
+    return password_hasher.stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready", include_in_schema=False)
+async def get_readiness():
+    pools = pool_monitor.snapshot(MONGO_MAX_POOL_SIZE)
+    saturation = max((pool["saturation"] for pool in pools.values()), default=0.0)
+    body = {"status": "ready", "pools": pools, "max_pool_size": MONGO_MAX_POOL_SIZE, "saturation": saturation}
+    if not app.state.ready:
+        body["status"] = "starting"
+    elif saturation >= READINESS_MAX_POOL_SATURATION:
+        body["status"] = "saturated"
+    else:
+        try:
+            await asyncio.wait_for(db.command("ping"), READINESS_TIMEOUT_SECONDS)
+        except (PyMongoError, asyncio.TimeoutError) as exc:
+            body["status"] = "unavailable"
+            body["detail"] = str(exc) or type(exc).__name__
+    return ORJSONResponse(body, status_code=200 if body["status"] == "ready" else 503)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    stats = RequestQueryStats()
+    stats_token = current_request_stats.set(stats)
+    route_token = current_route.set(request.url.path)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        current_request_stats.reset(stats_token)
+        current_route.reset(route_token)
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        labels = {"method": request.method, "route": route_path}
+        metrics.observe("scout_http_request_duration_seconds", {**labels, "status": status_code}, elapsed)
+        metrics.inc("scout_http_request_db_commands_total", labels, stats.count)
+        metrics.inc("scout_http_request_db_seconds_total", labels, stats.seconds)
+    response.headers["Server-Timing"] = f'app;dur={elapsed * 1000:.1f}, db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+    return response
 
 app.include_router(api_router)
 
@@ -280,6 +2436,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 logging.basicConfig(
@@ -288,6 +2445,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
+async def drop_obsolete_indexes():
+    for collection_name, names in OBSOLETE_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            try:
+                await db[collection_name].drop_index(name)
+            except OperationFailure as exc:
+                if exc.code != 27:
+                    raise
+                continue
+            logger.info("Dropped obsolete index %s on %s", name, collection_name)
+
+async def ensure_indexes():
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection_name].create_indexes([model])
+            except PyMongoError as exc:
+                logger.error("Could not create index %s on %s: %s", model.document["name"], collection_name, exc)
+
+background_tasks: List[asyncio.Task] = []
+
+async def warm_connection_pool():
+    start = time.perf_counter()
+    try:
+        await db.command("ping")
+    except PyMongoError as exc:
+        logger.error("MongoDB is not reachable at startup: %s", exc)
+        raise
+    await asyncio.gather(*(db.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)))
+    open_connections = sum(pool["open"] for pool in pool_monitor.snapshot(MONGO_MAX_POOL_SIZE).values())
+    logger.info("MongoDB connection pool warmed: %d connections open in %.1f ms", open_connections, (time.perf_counter() - start) * 1000)
+
+async def startup_indexes():
+    await drop_obsolete_indexes()
+    await migrate_membership_event_ids()
+    await ensure_indexes()
+    await migrate_embedded_memberships()
+    await migrate_event_dates()
+
+async def startup_stats():
+    try:
+        await reconcile_stats()
+    except PyMongoError as exc:
+        logger.error("Initial stats reconciliation failed: %s", exc)
+    try:
+        await ensure_rankings()
+    except PyMongoError as exc:
+        logger.error("Ranking rebuild failed: %s", exc)
+    background_tasks.append(asyncio.create_task(reconcile_stats_periodically()))
+
+async def startup_token_revocations():
+    try:
+        await sync_token_revocations()
+    except PyMongoError as exc:
+        logger.error("Initial token revocation sync failed: %s", exc)
+    background_tasks.append(asyncio.create_task(sync_token_revocations_periodically()))
+
+async def startup_archival():
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(archive_past_events_periodically()))
+
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    for task in background_tasks:
+        task.cancel()
+    client.close()
+    password_hasher.shutdown()
\ No newline at end of file
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent traffic through the API in-process and report latency percentiles. "
+                    "Without --mongo-url the app runs against mongomock-motor, which is useful for catching "
+                    "regressions in our own code paths but does not reflect real Mongo latency."
+    )
+    parser.add_argument("--mongo-url", help="Use a real mongod (e.g. mongodb://localhost:27017) instead of mongomock")
+    parser.add_argument("--db-name", default="scout_benchmark")
+    parser.add_argument("--users", type=int, default=1000, help="Members to seed")
+    parser.add_argument("--events", type=int, default=200, help="Events to seed")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scenarios", default="login,list_users,list_events,assign,stats,dashboard")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="Work factor for seeded passwords and login")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit non-zero if any scenario's p95 exceeds this")
+    return parser.parse_args()
+
+def configure_environment(args):
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("STATS_RECONCILE_INTERVAL_SECONDS", "3600")
+    os.environ.setdefault("LOGIN_IP_BURST", "1000000")
+    os.environ.setdefault("LOGIN_EMAIL_BURST", "1000000")
+    if not args.mongo_url:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+
+async def seed(server, users: int, events: int):
+    db = server.db
+    for name in ["users", "events", "memberships", "stats", "versions", "rankings", "achievement_totals",
+                 "jobs", "events_archive", "token_revocations"]:
+        await db[name].delete_many({})
+    password_hash = server.pwd_context.hash("bench123")
+    staff = [
+        {"name": "Bench Chief", "email": "chief@scoutbench.com", "role": "chief"},
+        {"name": "Bench Admin", "email": "admin@scoutbench.com", "role": "admin"},
+    ]
+    members = [{"name": f"Scout {i}", "email": f"scout{i}@scoutbench.com", "role": "user"} for i in range(users)]
+    accounts = [
+        {**u, "uniform_required": "Standard Scout Uniform", "password_hash": password_hash,
+         "events_joined_count": 0, "achievements": []}
+        for u in staff + members
+    ]
+    await db.users.insert_many(accounts)
+    await db.events.insert_many([
+        {"event_name": f"Bench Event {i}", "date": f"2030-01-{i % 28 + 1:02d}",
+         "description": "Benchmark event", "created_by": "admin@scoutbench.com"}
+        for i in range(events)
+    ])
+    return accounts[1], accounts[len(staff):]
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def run_scenario(client, name: str, make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def build_scenarios(server, admin, accounts, event_count: int):
+    admin_headers = {"Authorization": f"Bearer {server.issue_tokens(admin)['token']}"}
+    member_headers = [{"Authorization": f"Bearer {server.issue_tokens(account)['token']}"} for account in accounts]
+    members = [account["email"] for account in accounts]
+    pairs = [(e, m) for e in range(event_count) for m in range(len(members))]
+    random.shuffle(pairs)
+
+    async def login(client, i):
+        return await client.post("/api/auth/login", json={"email": members[i % len(members)], "password": "bench123"})
+
+    async def list_users(client, i):
+        return await client.get("/api/users", params={"limit": 100}, headers=admin_headers)
+
+    async def list_events(client, i):
+        return await client.get("/api/events", params={"limit": 100}, headers=member_headers[i % len(members)])
+
+    async def assign(client, i):
+        event_index, member_index = pairs[i % len(pairs)]
+        return await client.post(
+            f"/api/events/Bench Event {event_index}/assign-user",
+            params={"user_email": members[member_index]},
+            headers=admin_headers
+        )
+
+    async def stats(client, i):
+        return await client.get("/api/stats", headers=admin_headers)
+
+    async def dashboard(client, i):
+        return await client.get("/api/dashboard", headers=admin_headers)
+
+    return {
+        "login": login,
+        "list_users": list_users,
+        "list_events": list_events,
+        "assign": assign,
+        "stats": stats,
+        "dashboard": dashboard,
+    }
+
+async def run(args) -> list:
+    import httpx
+    import server
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    admin, members = await seed(server, args.users, args.events)
+    scenarios = build_scenarios(server, admin, members, args.events)
+    results = []
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            for name in args.scenarios.split(","):
+                if name not in scenarios:
+                    raise SystemExit(f"Unknown scenario: {name}")
+                results.append(await run_scenario(client, name, scenarios[name], args.requests, args.concurrency))
+    return results
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    results = asyncio.run(run(args))
+
+    print(f"{'scenario':<12} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['scenario']:<12} {r['requests']:>8} {r['errors']:>6} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    failed = [r for r in results if r["errors"] or (args.max_p95_ms and r["p95_ms"] > args.max_p95_ms)]
+    if failed:
+        print(f"FAILED: {', '.join(r['scenario'] for r in failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
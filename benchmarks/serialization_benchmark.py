@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "scout_benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from server import User
+
+def make_users(count: int) -> List[dict]:
+    return [
+        {
+            "name": f"Scout {i}",
+            "email": f"scout{i}@scout.com",
+            "role": "user",
+            "uniform_required": "Standard Scout Uniform",
+            "events_joined_count": i % 40,
+            "achievements": [f"Badge {j}" for j in range(i % 6)]
+        }
+        for i in range(count)
+    ]
+
+def validated_path(docs: List[dict], adapter: TypeAdapter) -> bytes:
+    users = [User(**u) for u in docs]
+    content = adapter.dump_python(adapter.validate_python(users), mode="json")
+    return JSONResponse(content).body
+
+def trusted_path(docs: List[dict], adapter: TypeAdapter) -> bytes:
+    return ORJSONResponse(docs).body
+
+def measure(fn, docs: List[dict], adapter: TypeAdapter, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs, adapter)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare validated vs trusted list serialization")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[User])
+    results = []
+    print(f"{'documents':>10} {'validated ms':>14} {'trusted ms':>12} {'speedup':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        docs = make_users(size)
+        assert json.loads(validated_path(docs, adapter)) == json.loads(trusted_path(docs, adapter))
+        validated = measure(validated_path, docs, adapter, args.repeat)
+        trusted = measure(trusted_path, docs, adapter, args.repeat)
+        results.append({"documents": size, "validated_ms": validated * 1000, "trusted_ms": trusted * 1000})
+        print(f"{size:>10} {validated * 1000:>14.2f} {trusted * 1000:>12.2f} {validated / trusted:>8.1f}x")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { createContext, useState, useContext, useEffect } from 'react';
+import React, { createContext, useState, useContext, useEffect, useRef } from 'react';
 import axios from 'axios';
 
 const AuthContext = createContext(null);
@@ -10,6 +10,42 @@ export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
   const [token, setToken] = useState(localStorage.getItem('token'));
   const [loading, setLoading] = useState(true);
+  const refreshing = useRef(null);
+
+  useEffect(() => {
+    const interceptor = axios.interceptors.response.use(
+      (response) => response,
+      async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (
+          error.response?.status !== 401 ||
+          !refreshToken ||
+          !original ||
+          original._retried ||
+          original.url?.startsWith(`${API}/auth/`)
+        ) {
+          return Promise.reject(error);
+        }
+        original._retried = true;
+        try {
+          if (!refreshing.current) {
+            refreshing.current = axios
+              .post(`${API}/auth/refresh`, { refresh_token: refreshToken })
+              .finally(() => { refreshing.current = null; });
+          }
+          const response = await refreshing.current;
+          storeTokens(response.data.token, response.data.refresh_token);
+          original.headers = { ...original.headers, Authorization: `Bearer ${response.data.token}` };
+          return axios(original);
+        } catch (refreshError) {
+          logout();
+          return Promise.reject(error);
+        }
+      }
+    );
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
 
   useEffect(() => {
     if (token) {
@@ -35,26 +71,39 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (email, password) => {
     const response = await axios.post(`${API}/auth/login`, { email, password });
-    const { token: newToken, ...userData } = response.data;
-    setToken(newToken);
+    const { token: newToken, refresh_token: refreshToken, ...userData } = response.data;
+    storeTokens(newToken, refreshToken);
     setUser(userData);
-    localStorage.setItem('token', newToken);
     return userData;
   };
 
   const register = async (name, email, password, role) => {
     const response = await axios.post(`${API}/auth/register`, { name, email, password, role });
-    const { token: newToken, ...userData } = response.data;
-    setToken(newToken);
+    const { token: newToken, refresh_token: refreshToken, ...userData } = response.data;
+    storeTokens(newToken, refreshToken);
     setUser(userData);
-    localStorage.setItem('token', newToken);
     return userData;
   };
 
+  const storeTokens = (newToken, refreshToken) => {
+    setToken(newToken);
+    localStorage.setItem('token', newToken);
+    if (refreshToken) {
+      localStorage.setItem('refresh_token', refreshToken);
+    }
+  };
+
   const logout = () => {
+    const currentToken = localStorage.getItem('token');
+    if (currentToken) {
+      axios
+        .post(`${API}/auth/logout`, null, { headers: { Authorization: `Bearer ${currentToken}` } })
+        .catch(() => {});
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
   };
 
   return (
@@ -1,6 +1,23 @@
+import axios from "axios";
 import { clsx } from "clsx";
 import { twMerge } from "tailwind-merge"
 
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+export function formatEventDate(value) {
+  const parsed = new Date(value);
+  return Number.isNaN(parsed.getTime()) ? value : parsed.toLocaleDateString();
+}
+
+export async function fetchAllPages(url, config, items = [], cursor = null) {
+  let results = items;
+  let next = cursor;
+  while (next) {
+    const response = await axios.get(url, { ...config, params: { ...config.params, after: next } });
+    results = results.concat(response.data);
+    next = response.headers['x-next-cursor'];
+  }
+  return results;
+}
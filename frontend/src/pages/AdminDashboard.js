@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, formatEventDate } from '../lib/utils';
 import { Users, Calendar, Award, LogOut, UserPlus, Plus, X, Trash2 } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -28,14 +29,17 @@ const AdminDashboard = () => {
 
   const loadData = async () => {
     try {
-      const [statsRes, usersRes, eventsRes] = await Promise.all([
-        axios.get(`${API}/stats`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/users`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/events`, { headers: { Authorization: `Bearer ${token}` } })
+      const config = { headers: { Authorization: `Bearer ${token}` } };
+      const response = await axios.get(`${API}/dashboard`, config);
+      setStats(response.data.stats);
+      setUsers(response.data.users);
+      setEvents(response.data.events);
+      const [allUsers, allEvents] = await Promise.all([
+        fetchAllPages(`${API}/users`, config, response.data.users, response.data.users_next_cursor),
+        fetchAllPages(`${API}/events`, config, response.data.events, response.data.events_next_cursor)
       ]);
-      setStats(statsRes.data);
-      setUsers(usersRes.data);
-      setEvents(eventsRes.data);
+      setUsers(allUsers);
+      setEvents(allEvents);
     } catch (error) {
       console.error('Failed to load data:', error);
     } finally {
@@ -58,7 +62,7 @@ const AdminDashboard = () => {
   const handleAssignUser = async (userEmail) => {
     try {
       await axios.post(
-        `${API}/events/${selectedEvent.event_name}/assign-user`,
+        `${API}/events/id/${selectedEvent.id}/assign-user`,
         null,
         { 
           params: { user_email: userEmail },
@@ -88,10 +92,10 @@ const AdminDashboard = () => {
     }
   };
 
-  const handleJoinEvent = async (eventName) => {
+  const handleJoinEvent = async (event) => {
     try {
       await axios.post(
-        `${API}/events/${eventName}/join`,
+        `${API}/events/id/${event.id}/join`,
         null,
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -101,11 +105,11 @@ const AdminDashboard = () => {
     }
   };
 
-  const handleDeleteEvent = async (eventName) => {
-    if (!window.confirm(`Are you sure you want to delete "${eventName}"?`)) return;
+  const handleDeleteEvent = async (event) => {
+    if (!window.confirm(`Are you sure you want to delete "${event.event_name}"?`)) return;
     
     try {
-      await axios.delete(`${API}/events/${eventName}`, { headers: { Authorization: `Bearer ${token}` } });
+      await axios.delete(`${API}/events/id/${event.id}`, { headers: { Authorization: `Bearer ${token}` } });
       loadData();
     } catch (error) {
       alert(error.response?.data?.detail || 'Failed to delete event');
@@ -219,7 +223,7 @@ const AdminDashboard = () => {
               {events.map((event, index) => (
                 <div key={index} data-testid={`event-card-${index}`} className="border border-slate-200 rounded-lg p-4 hover:shadow-md transition-shadow">
                   <h3 className="font-manrope font-semibold text-slate-900">{event.event_name}</h3>
-                  <p className="text-sm text-slate-600 font-inter mt-1">{event.date}</p>
+                  <p className="text-sm text-slate-600 font-inter mt-1">{formatEventDate(event.date)}</p>
                   <p className="text-sm text-slate-600 font-inter mt-2">{event.description}</p>
                   <div className="flex items-center gap-2 mt-3">
                     <span className="bg-emerald-100 text-emerald-700 px-2 py-1 rounded-full text-xs font-medium">
@@ -242,14 +246,14 @@ const AdminDashboard = () => {
                     </button>
                     <button
                       data-testid={`join-event-button-${index}`}
-                      onClick={() => handleJoinEvent(event.event_name)}
+                      onClick={() => handleJoinEvent(event)}
                       className="flex-1 h-8 px-3 bg-violet-800 hover:bg-violet-900 text-white rounded-md font-manrope font-medium text-xs transition-all"
                     >
                       Join Event
                     </button>
                     <button
                       data-testid={`delete-event-button-${index}`}
-                      onClick={() => handleDeleteEvent(event.event_name)}
+                      onClick={() => handleDeleteEvent(event)}
                       className="h-8 w-8 bg-red-50 hover:bg-red-100 text-red-600 rounded-md font-manrope font-medium text-xs transition-all flex items-center justify-center"
                       title="Delete Event"
                     >
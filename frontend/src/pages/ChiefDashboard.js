@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages } from '../lib/utils';
 import { Shield, Users, Calendar, LogOut, UserPlus, Trash2, X } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -22,12 +23,16 @@ const ChiefDashboard = () => {
 
   const loadData = async () => {
     try {
-      const [usersRes, eventsRes] = await Promise.all([
-        axios.get(`${API}/users`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/events`, { headers: { Authorization: `Bearer ${token}` } })
+      const config = { headers: { Authorization: `Bearer ${token}` } };
+      const response = await axios.get(`${API}/dashboard`, config);
+      setUsers(response.data.users);
+      setEvents(response.data.events);
+      const [allUsers, allEvents] = await Promise.all([
+        fetchAllPages(`${API}/users`, config, response.data.users, response.data.users_next_cursor),
+        fetchAllPages(`${API}/events`, config, response.data.events, response.data.events_next_cursor)
       ]);
-      setUsers(usersRes.data);
-      setEvents(eventsRes.data);
+      setUsers(allUsers);
+      setEvents(allEvents);
     } catch (error) {
       console.error('Failed to load data:', error);
     } finally {
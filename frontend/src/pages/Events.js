@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, formatEventDate } from '../lib/utils';
 import { Calendar, Users, ArrowLeft, MapPin } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -19,8 +20,10 @@ const Events = () => {
 
   const loadEvents = async () => {
     try {
-      const response = await axios.get(`${API}/events`, { headers: { Authorization: `Bearer ${token}` } });
+      const config = { headers: { Authorization: `Bearer ${token}` } };
+      const response = await axios.get(`${API}/events`, config);
       setEvents(response.data);
+      setEvents(await fetchAllPages(`${API}/events`, config, response.data, response.headers['x-next-cursor']));
     } catch (error) {
       console.error('Failed to load events:', error);
     } finally {
@@ -96,7 +99,7 @@ const Events = () => {
                 <div className="p-5">
                   <div className="flex items-center gap-2 text-sm text-slate-600 font-inter mb-3">
                     <Calendar className="w-4 h-4" />
-                    <span>{event.date}</span>
+                    <span>{formatEventDate(event.date)}</span>
                   </div>
 
                   <p className="text-sm text-slate-600 font-inter mb-4 line-clamp-2">{event.description}</p>
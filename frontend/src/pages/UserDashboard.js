@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, formatEventDate } from '../lib/utils';
 import { Award, Calendar, LogOut, TrendingUp, Shirt } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -10,7 +11,7 @@ const API = `${BACKEND_URL}/api`;
 const UserDashboard = () => {
   const { user, token, logout } = useAuth();
   const navigate = useNavigate();
-  const [events, setEvents] = useState([]);
+  const [myEvents, setMyEvents] = useState([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -19,8 +20,10 @@ const UserDashboard = () => {
 
   const loadEvents = async () => {
     try {
-      const response = await axios.get(`${API}/events`, { headers: { Authorization: `Bearer ${token}` } });
-      setEvents(response.data);
+      const config = { headers: { Authorization: `Bearer ${token}` } };
+      const response = await axios.get(`${API}/users/me/events`, config);
+      setMyEvents(response.data);
+      setMyEvents(await fetchAllPages(`${API}/users/me/events`, config, response.data, response.headers['x-next-cursor']));
     } catch (error) {
       console.error('Failed to load events:', error);
     } finally {
@@ -28,8 +31,6 @@ const UserDashboard = () => {
     }
   };
 
-  const myEvents = events.filter(e => e.users_assigned?.includes(user?.email));
-
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-slate-50">
@@ -132,7 +133,7 @@ const UserDashboard = () => {
               {myEvents.map((event, index) => (
                 <div key={index} data-testid={`my-event-card-${index}`} className="border border-slate-200 rounded-lg p-4 hover:shadow-md transition-shadow">
                   <h3 className="font-manrope font-semibold text-slate-900">{event.event_name}</h3>
-                  <p className="text-sm text-slate-600 font-inter mt-1">{event.date}</p>
+                  <p className="text-sm text-slate-600 font-inter mt-1">{formatEventDate(event.date)}</p>
                   <p className="text-sm text-slate-600 font-inter mt-2">{event.description}</p>
                   <div className="mt-3">
                     <span className="bg-emerald-100 text-emerald-700 px-2 py-1 rounded-full text-xs font-medium">
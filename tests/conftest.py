@@ -0,0 +1,75 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "scout_test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import mongomock_motor
+import motor.motor_asyncio
+
+motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx
+import pytest
+
+import server
+
+CHIEF_EMAIL = "chief@scout.com"
+PASSWORD = "demo123"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def app_state(monkeypatch):
+    monkeypatch.setattr(server, "password_hasher", server.PasswordHasher(server.pwd_context, 2, 2, 0))
+    monkeypatch.setattr(server, "response_cache", server.ResponseCache(server.LRUCache(100, 30)))
+    monkeypatch.setattr(server, "login_throttle", server.LoginThrottle(server.InMemoryRateLimitBackend(1000)))
+    monkeypatch.setattr(server, "token_revocations", server.TokenRevocations())
+    server.principal_cache.clear()
+
+
+@pytest.fixture
+async def database(app_state):
+    for name in await server.db.list_collection_names():
+        await server.db[name].delete_many({})
+    await server.ensure_indexes()
+    await server.db.users.insert_one({
+        "name": "Chief", "email": CHIEF_EMAIL, "role": "chief", "uniform_required": "Standard Scout Uniform",
+        "password_hash": server.pwd_context.hash(PASSWORD), "events_joined_count": 0, "achievements": []
+    })
+    return server.db
+
+
+@pytest.fixture
+async def job_queue(database):
+    await server.job_queue.start()
+    yield server.job_queue
+    await server.job_queue.stop(1)
+
+
+@pytest.fixture
+async def client(database):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
+
+
+@pytest.fixture
+def login(client):
+    async def login_as(email: str = CHIEF_EMAIL, password: str = PASSWORD) -> dict:
+        response = await client.post("/api/auth/login", json={"email": email, "password": password})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return login_as
+
+
+@pytest.fixture
+async def chief_headers(login):
+    return {"Authorization": f"Bearer {(await login())['token']}"}
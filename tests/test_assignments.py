@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_assignments_apply_once(client, chief_headers, job_queue):
+    response = await client.post("/api/users", headers=chief_headers, json={
+        "name": "Scout", "email": "scout@scout.com", "role": "user", "password": "demo123"
+    })
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/events", headers=chief_headers, json={
+        "event_name": "Camp", "date": "2030-01-01", "description": "Weekend camp"
+    })
+    assert response.status_code == 200, response.text
+    responses = await asyncio.gather(*(
+        client.post("/api/events/Camp/assign-user", params={"user_email": "scout@scout.com"}, headers=chief_headers)
+        for _ in range(10)
+    ))
+    await job_queue.wait_idle()
+    assert sorted(response.status_code for response in responses) == [200] + [400] * 9
+    event = await server.db.events.find_one({"event_name": "Camp"})
+    assert await server.db.memberships.count_documents({"event_id": event["_id"], "kind": "assigned"}) == 1
+    user = await server.db.users.find_one({"email": "scout@scout.com"})
+    assert user["events_joined_count"] == 1
+
+
+async def test_delete_user_defers_counters_to_cleanup_job(client, chief_headers, job_queue):
+    response = await client.post("/api/users", headers=chief_headers, json={
+        "name": "Scout", "email": "scout@scout.com", "role": "user", "password": "demo123"
+    })
+    assert response.status_code == 200, response.text
+    await client.post("/api/events", headers=chief_headers, json={"event_name": "Camp", "date": "2030-01-01", "description": "d"})
+    await client.post("/api/events/Camp/assign-user", params={"user_email": "scout@scout.com"}, headers=chief_headers)
+    await job_queue.wait_idle()
+    assert (await server.read_stats())["total_users"] == 1
+    
+    response = await client.delete("/api/users/scout@scout.com", headers=chief_headers)
+    assert response.status_code == 200, response.text
+    assert server.token_revocations.is_revoked("scout@scout.com", 0)
+    await job_queue.wait_idle()
+    assert (await server.read_stats())["total_users"] == 0
+    assert await server.db.rankings.count_documents({"_id": "scout@scout.com"}) == 0
+    assert await server.db.memberships.count_documents({"email": "scout@scout.com"}) == 0
+    assert await server.db.jobs.count_documents({}) == 0
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(disconnected: asyncio.Event) -> Request:
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+    scope = {"type": "http", "method": "GET", "path": "/api/changes/stream", "headers": [], "query_string": b""}
+    return Request(scope, receive)
+
+
+def make_payload(email="scout@scout.com", ttl=900):
+    now = time.time()
+    return {"sub": email, "iat": now, "exp": now + ttl, "type": "access"}
+
+
+async def open_stream(payload, disconnected=None):
+    response = await server.stream_changes(make_request(disconnected or asyncio.Event()), payload)
+    frames = response.body_iterator
+    assert await frames.__anext__() == "retry: 3000\n\n"
+    return frames
+
+
+async def read_all(frames, timeout=2):
+    collected = []
+    async def consume():
+        async for frame in frames:
+            collected.append(frame)
+    await asyncio.wait_for(consume(), timeout)
+    return collected
+
+
+@pytest.fixture
+def feed(app_state, monkeypatch):
+    broadcaster = server.ChangeBroadcaster(2)
+    monkeypatch.setattr(server, "change_feed", broadcaster)
+    return broadcaster
+
+
+async def test_publish_fans_out_to_every_subscriber(feed):
+    first = await open_stream(make_payload())
+    second = await open_stream(make_payload())
+    feed.publish("event_created", {"id": "e1"})
+    for frames in (first, second):
+        frame = await frames.__anext__()
+        assert frame.startswith("id: 1\nevent: event_created\n") and '"e1"' in frame
+    await first.aclose()
+    await second.aclose()
+    assert feed.stats()["subscribers"] == 0
+
+
+async def test_slow_subscriber_is_dropped_without_blocking_others(feed):
+    fast = await open_stream(make_payload())
+    slow = await open_stream(make_payload())
+    received = []
+    for index in range(3):
+        feed.publish("event_updated", {"id": index})
+        received.append(await fast.__anext__())
+    assert len(received) == 3
+    assert feed.stats()["dropped_subscribers"] == 1
+    assert feed.stats()["subscribers"] == 1
+    leftover = await read_all(slow)
+    assert len(leftover) == 1 and leftover[0].startswith("id: 2\n")
+    await fast.aclose()
+
+
+async def test_disconnect_unsubscribes(feed):
+    disconnected = asyncio.Event()
+    frames = await open_stream(make_payload(), disconnected)
+    assert feed.stats()["subscribers"] == 1
+    disconnected.set()
+    assert await read_all(frames) == []
+    assert feed.stats()["subscribers"] == 0
+
+
+async def test_stream_closes_when_token_expires(feed, monkeypatch):
+    monkeypatch.setattr(server, "CHANGE_FEED_HEARTBEAT_SECONDS", 0.02)
+    frames = await open_stream(make_payload(ttl=0.1))
+    collected = await read_all(frames)
+    assert ": keep-alive\n\n" in collected
+    assert collected[-1].startswith("event: reauthenticate")
+    assert feed.stats()["subscribers"] == 0
+
+
+async def test_stream_closes_when_token_is_revoked(feed, monkeypatch):
+    monkeypatch.setattr(server, "CHANGE_FEED_HEARTBEAT_SECONDS", 0.02)
+    payload = make_payload()
+    frames = await open_stream(payload)
+    assert await frames.__anext__() == ": keep-alive\n\n"
+    server.token_revocations.revoke(payload["sub"], time.time(), time.time() + 60)
+    collected = await read_all(frames)
+    assert collected[-1].startswith("event: reauthenticate")
+
+
+async def test_stream_ticket_is_bound_to_the_access_token(app_state):
+    payload = make_payload(ttl=600)
+    ticket = server.decode_token(server.create_stream_ticket(payload), "stream")
+    assert ticket["until"] == payload["exp"]
+    assert ticket["exp"] <= time.time() + server.CHANGE_FEED_TICKET_SECONDS
+    access_token = server.create_access_token({"sub": payload["sub"], "role": "user", "ver": 0})
+    with pytest.raises(HTTPException) as error:
+        await server.get_stream_token(ticket=access_token, credentials=None)
+    assert error.value.status_code == 401
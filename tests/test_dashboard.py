@@ -0,0 +1,22 @@
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reconciled_stats_change_dashboard_etag(client, chief_headers):
+    await server.reconcile_stats()
+    response = await client.get("/api/dashboard", headers=chief_headers)
+    assert response.status_code == 200, response.text
+    etag = response.headers["etag"]
+    response = await client.get("/api/dashboard", headers={**chief_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await server.db.stats.update_one({"_id": server.STATS_DOCUMENT_ID}, {"$set": {"total_users": 7}})
+    await server.response_cache.invalidate("stats")
+    await server.reconcile_stats()
+    response = await client.get("/api/dashboard", headers={**chief_headers, "If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
+    assert response.json()["stats"]["total_users"] == 0
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+DATES = [("E1", "2050-03-01"), ("E2", "2050-01-01"), ("E3", "2050-02-01"), ("E4", "2050-01-01"), ("E5", "2050-02-01T10:30:00.123"), ("Old", "2020-01-01")]
+
+
+async def collect_pages(client, headers, path, params):
+    names, cursors, after = [], [], None
+    while True:
+        response = await client.get(path, params={**params, **({"after": after} if after else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert all(set(doc) == {"event_name"} for doc in response.json())
+        names += [doc["event_name"] for doc in response.json()]
+        after = response.headers.get(server.NEXT_CURSOR_HEADER)
+        if not after:
+            return names, cursors
+        cursors.append(after)
+
+
+async def test_date_filtered_events_page_on_date_then_id(client, chief_headers):
+    for name, date in DATES:
+        response = await client.post("/api/events", json={"event_name": name, "date": date, "description": "d"}, headers=chief_headers)
+        assert response.status_code == 200, response.text
+    names, cursors = await collect_pages(client, chief_headers, "/api/events", {"date_from": "2040-01-01", "limit": 2, "fields": "event_name"})
+    assert names == ["E2", "E4", "E3", "E5", "E1"]
+    assert all("_" in cursor for cursor in cursors)
+    response = await client.get("/api/events", params={"date_from": "2040-01-01", "after": "abc"}, headers=chief_headers)
+    assert response.status_code == 400
+
+
+async def test_date_filtered_archive_pages_on_date_then_id(client, chief_headers):
+    await server.db.events_archive.insert_many([
+        {"event_name": name, "date": datetime.fromisoformat(date), "description": "d", "archived_at": datetime(2051, 1, 1)}
+        for name, date in DATES
+    ])
+    params = {"date_to": "2060-01-01", "date_from": "2040-01-01", "limit": 2, "fields": "event_name"}
+    names, cursors = await collect_pages(client, chief_headers, "/api/events/archive", params)
+    assert names == ["E2", "E4", "E3", "E5", "E1"]
+    assert all("_" in cursor for cursor in cursors)
+    names, cursors = await collect_pages(client, chief_headers, "/api/events/archive", {"limit": 4, "fields": "event_name"})
+    assert sorted(names) == sorted(name for name, _ in DATES) and "_" not in cursors[0]
@@ -0,0 +1,38 @@
+import mongomock_motor
+import pytest
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_drop_obsolete_indexes_removes_event_array_indexes(database):
+    await database.events.create_index([("users_assigned", ASCENDING)], name="users_assigned")
+    await database.events.create_index([("admins_joined", ASCENDING)], name="admins_joined")
+    await server.drop_obsolete_indexes()
+    existing = await database.events.index_information()
+    assert "users_assigned" not in existing
+    assert "admins_joined" not in existing
+
+
+async def test_drop_obsolete_indexes_tolerates_concurrent_drop(database, monkeypatch):
+    await database.events.create_index([("users_assigned", ASCENDING)], name="users_assigned")
+
+    async def dropped_elsewhere(self, name, *args, **kwargs):
+        raise OperationFailure(f"index not found with name [{name}]", code=27)
+
+    monkeypatch.setattr(mongomock_motor.AsyncMongoMockCollection, "drop_index", dropped_elsewhere)
+    await server.drop_obsolete_indexes()
+
+
+async def test_drop_obsolete_indexes_raises_other_failures(database, monkeypatch):
+    await database.events.create_index([("users_assigned", ASCENDING)], name="users_assigned")
+
+    async def unauthorized(self, name, *args, **kwargs):
+        raise OperationFailure("not authorized", code=13)
+
+    monkeypatch.setattr(mongomock_motor.AsyncMongoMockCollection, "drop_index", unauthorized)
+    with pytest.raises(OperationFailure):
+        await server.drop_obsolete_indexes()
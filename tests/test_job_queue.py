@@ -0,0 +1,124 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def queue(database):
+    job_queue = server.JobQueue(2, 3, 0.02)
+    job_queue.handlers = dict(server.job_queue.handlers)
+    return job_queue
+
+
+async def drain(job_queue: server.JobQueue) -> None:
+    for _ in range(200):
+        await job_queue.wait_idle()
+        if not await server.db.jobs.count_documents({"status": {"$in": ["pending", "running"]}}):
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail("job queue did not drain")
+
+
+async def test_retried_counter_job_increments_once(queue, monkeypatch):
+    bump_versions = server.bump_versions
+    failures = []
+    async def flaky_bump_versions(*collections):
+        if not failures:
+            failures.append(collections)
+            raise RuntimeError("versions unavailable")
+        await bump_versions(*collections)
+    monkeypatch.setattr(server, "bump_versions", flaky_bump_versions)
+    
+    await server.db.users.insert_one({"email": "scout@scout.com", "role": "user", "events_joined_count": 0})
+    await server.db.rankings.insert_one({"_id": "scout@scout.com", "events_joined_count": 0, "achievements_count": 0, "score": 0})
+    await queue.start()
+    try:
+        await queue.enqueue("assignment.counters", {"emails": ["scout@scout.com"]})
+        await drain(queue)
+    finally:
+        await queue.stop(1)
+    assert failures == [("users", "events")]
+    assert queue.retried == 1 and queue.completed == 1
+    user = await server.db.users.find_one({"email": "scout@scout.com"})
+    assert user["events_joined_count"] == 1
+    ranking = await server.db.rankings.find_one({"_id": "scout@scout.com"})
+    assert ranking["events_joined_count"] == 1
+    assert await server.db.jobs.count_documents({}) == 0
+
+
+async def test_retry_after_many_newer_jobs_still_applies_once(queue, monkeypatch):
+    bump_versions = server.bump_versions
+    failing = []
+    async def flaky_bump_versions(*collections):
+        if not failing:
+            failing.append(collections)
+            raise RuntimeError("versions unavailable")
+        await bump_versions(*collections)
+    monkeypatch.setattr(server, "bump_versions", flaky_bump_versions)
+    monkeypatch.setattr(queue, "retry_base_seconds", 0.2)
+    
+    await server.db.users.insert_one({"email": "scout@scout.com", "role": "user", "events_joined_count": 0})
+    await queue.start()
+    try:
+        await queue.enqueue("assignment.counters", {"emails": ["scout@scout.com"]})
+        await queue.wait_idle()
+        for _ in range(25):
+            await queue.enqueue("assignment.counters", {"emails": ["scout@scout.com"]})
+        await drain(queue)
+    finally:
+        await queue.stop(1)
+    assert queue.retried == 1 and queue.completed == 26
+    user = await server.db.users.find_one({"email": "scout@scout.com"})
+    assert user["events_joined_count"] == 26
+
+
+async def test_failing_job_backs_off_then_fails(queue):
+    attempts = []
+    @queue.handler("always.fails")
+    async def always_fails(job):
+        attempts.append(time.monotonic())
+        raise RuntimeError("boom")
+    
+    await queue.start()
+    try:
+        job_id = await queue.enqueue("always.fails", {})
+        await drain(queue)
+    finally:
+        await queue.stop(1)
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.02 and attempts[2] - attempts[1] >= 0.04
+    assert queue.retried == 2 and queue.failed == 1
+    job = await server.db.jobs.find_one({"_id": job_id})
+    assert job["status"] == "failed" and job["attempts"] == 3 and job["error"] == "boom"
+
+
+async def test_start_recovers_stale_running_jobs(queue):
+    processed = []
+    @queue.handler("record")
+    async def record(job):
+        processed.append(job["payload"]["name"])
+    
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=server.JOB_STALE_SECONDS + 60)
+    await server.db.jobs.insert_many([
+        {"name": "record", "payload": {"name": "stale"}, "status": "running", "attempts": 1,
+         "run_at": stale, "locked_at": stale, "created_at": stale},
+        {"name": "record", "payload": {"name": "active"}, "status": "running", "attempts": 1,
+         "run_at": now, "locked_at": now, "created_at": now},
+        {"name": "record", "payload": {"name": "pending"}, "status": "pending", "attempts": 0,
+         "run_at": now, "created_at": now}
+    ])
+    await queue.start()
+    try:
+        await queue.wait_idle()
+    finally:
+        await queue.stop(1)
+    assert sorted(processed) == ["pending", "stale"]
+    remaining = await server.db.jobs.find({}, {"_id": 0, "payload": 1, "status": 1}).to_list(None)
+    assert remaining == [{"payload": {"name": "active"}, "status": "running"}]
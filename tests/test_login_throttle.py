@@ -0,0 +1,95 @@
+import ipaddress
+
+import pytest
+from starlette.requests import Request
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for is not None else []
+    return Request({"type": "http", "method": "POST", "path": "/api/auth/login", "headers": headers, "client": (peer, 4000)})
+
+
+@pytest.mark.parametrize("peer, forwarded_for, expected", [
+    ("203.0.113.9", "198.51.100.1", "203.0.113.9"),
+    ("10.0.0.2", "198.51.100.1", "10.0.0.2"),
+    ("127.0.0.1", "203.0.113.7, 127.0.0.1", "203.0.113.7"),
+    ("127.0.0.1", "198.51.100.1, 203.0.113.7", "203.0.113.7"),
+    ("127.0.0.1", None, "127.0.0.1"),
+    ("127.0.0.1", "", "127.0.0.1"),
+    ("::1", "127.0.0.1, ::1", "127.0.0.1"),
+])
+def test_client_ip_trusts_only_configured_proxies(peer, forwarded_for, expected):
+    assert server.client_ip(make_request(peer, forwarded_for)) == expected
+
+
+def test_client_ip_skips_operator_configured_proxy_hops(monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+    assert server.client_ip(make_request("10.0.0.5", "203.0.113.7, 10.0.0.9")) == "203.0.113.7"
+    assert server.client_ip(make_request("10.0.0.5", "not-an-ip, 10.0.0.9")) == "not-an-ip"
+
+
+async def attempt(client, email, password="wrong", forwarded_for=None):
+    headers = {"X-Forwarded-For": forwarded_for} if forwarded_for else {}
+    return await client.post("/api/auth/login", json={"email": email, "password": password}, headers=headers)
+
+
+async def test_ip_bucket_rejects_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_IP_BURST", 2)
+    monkeypatch.setattr(server, "LOGIN_IP_REFILL_PER_SECOND", 0.5)
+    for index in range(2):
+        assert (await attempt(client, f"user{index}@scout.com", forwarded_for="203.0.113.7")).status_code == 401
+    response = await attempt(client, "user3@scout.com", forwarded_for="203.0.113.7")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert (await attempt(client, "user3@scout.com", forwarded_for="203.0.113.8")).status_code == 401
+    assert server.login_throttle.stats()["rejected"]["ip"] == 1
+
+
+async def test_ip_bucket_applies_to_proxy_without_forwarded_header(client, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_IP_BURST", 1)
+    monkeypatch.setattr(server, "LOGIN_IP_REFILL_PER_SECOND", 0)
+    assert (await attempt(client, "a@scout.com")).status_code == 401
+    response = await attempt(client, "b@scout.com")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(int(server.LOGIN_LOCKOUT_MAX_SECONDS))
+
+
+async def test_email_bucket_limits_one_account_across_addresses(client, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_EMAIL_BURST", 2)
+    for index in range(2):
+        assert (await attempt(client, "chief@scout.com", forwarded_for=f"203.0.113.{index}")).status_code == 401
+    response = await attempt(client, "chief@scout.com", forwarded_for="203.0.113.99")
+    assert response.status_code == 429
+    assert server.login_throttle.stats()["rejected"]["email"] == 1
+
+
+async def test_lockout_blocks_correct_password_without_verifying(client, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_LOCKOUT_THRESHOLD", 3)
+    verified = []
+    verify_password = server.verify_password
+    async def counting_verify(plain_password, hashed_password):
+        verified.append(plain_password)
+        return await verify_password(plain_password, hashed_password)
+    monkeypatch.setattr(server, "verify_password", counting_verify)
+    for _ in range(3):
+        assert (await attempt(client, "chief@scout.com")).status_code == 401
+    response = await attempt(client, "chief@scout.com", password="demo123")
+    assert response.status_code == 429
+    assert int(server.LOGIN_LOCKOUT_BASE_SECONDS) - 1 <= int(response.headers["Retry-After"]) <= int(server.LOGIN_LOCKOUT_BASE_SECONDS)
+    assert verified == ["wrong"] * 3
+    assert server.login_throttle.stats()["rejected"]["lockout"] == 1
+
+
+async def test_successful_login_clears_failures(client, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_LOCKOUT_THRESHOLD", 3)
+    monkeypatch.setattr(server, "LOGIN_EMAIL_BURST", 10)
+    for _ in range(2):
+        assert (await attempt(client, "chief@scout.com")).status_code == 401
+    assert (await attempt(client, "chief@scout.com", password="demo123")).status_code == 200
+    for _ in range(2):
+        assert (await attempt(client, "chief@scout.com")).status_code == 401
+    assert (await attempt(client, "chief@scout.com", password="demo123")).status_code == 200
@@ -0,0 +1,71 @@
+import asyncio
+
+import mongomock_motor
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def interleaved_writes(monkeypatch):
+    collection = mongomock_motor.AsyncMongoMockCollection
+    for name in ["bulk_write", "delete_many"]:
+        original = getattr(collection, name)
+        def yielding(original):
+            async def write(self, *args, **kwargs):
+                await asyncio.sleep(0)
+                return await original(self, *args, **kwargs)
+            return write
+        monkeypatch.setattr(collection, name, yielding(original))
+
+
+async def seed_members(count: int) -> None:
+    await server.db.users.insert_many([
+        {"name": f"Scout {index}", "email": f"scout{index}@scout.com", "role": "user",
+         "events_joined_count": index, "achievements": ["Knots"] if index % 2 else []}
+        for index in range(count)
+    ])
+
+
+async def test_concurrent_rebuilds_keep_rankings_written_in_between(database, interleaved_writes):
+    await seed_members(10)
+    newcomer = {"name": "Newcomer", "email": "new@scout.com", "role": "user", "events_joined_count": 0, "achievements": ["Fire"]}
+    
+    async def join_mid_rebuild():
+        await asyncio.sleep(0)
+        await server.db.users.insert_one(dict(newcomer))
+        await server.upsert_rankings([newcomer])
+        await server.db.achievement_totals.update_one({"_id": "Fire"}, {"$inc": {"members": 1}}, upsert=True)
+    
+    first, second, _ = await asyncio.gather(server.rebuild_rankings(), server.rebuild_rankings(), join_mid_rebuild())
+    assert sorted([first, second], key=lambda rebuilt: rebuilt is None) == [10, None]
+    rankings = {doc["_id"]: doc async for doc in server.db.rankings.find({})}
+    assert len(rankings) == 11
+    assert rankings["new@scout.com"]["score"] == server.ranking_score(0, 1)
+    totals = {doc["_id"]: doc["members"] async for doc in server.db.achievement_totals.find({})}
+    assert totals == {"Knots": 5, "Fire": 1}
+    assert await server.db.leases.count_documents({}) == 0
+
+
+async def test_rebuild_removes_rankings_of_unranked_members(database):
+    await seed_members(3)
+    await server.db.rankings.insert_many([
+        {"_id": "gone@scout.com", "events_joined_count": 4, "achievements_count": 0, "score": 4},
+        {"_id": "chief@scout.com", "events_joined_count": 0, "achievements_count": 0, "score": 0}
+    ])
+    await server.db.achievement_totals.insert_one({"_id": "Retired", "members": 2})
+    assert await server.rebuild_rankings() == 3
+    assert sorted(await server.db.rankings.distinct("_id")) == ["scout0@scout.com", "scout1@scout.com", "scout2@scout.com"]
+    assert [doc async for doc in server.db.achievement_totals.find({})] == [{"_id": "Knots", "members": 1}]
+
+
+async def test_expired_lease_can_be_taken_over(database, monkeypatch):
+    monkeypatch.setattr(server, "RANKINGS_REBUILD_LEASE_SECONDS", 0)
+    stale = await server.acquire_lease("rankings.rebuild", 0)
+    assert stale is not None
+    await seed_members(2)
+    assert await server.rebuild_rankings() == 2
+    assert await server.acquire_lease("rankings.rebuild", 60) is not None
+    assert await server.acquire_lease("rankings.rebuild", 60) is None
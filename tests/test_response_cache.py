@@ -0,0 +1,71 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def make_cache(fake_server: fakeredis.FakeServer) -> server.ResponseCache:
+    backend = server.RedisCacheBackend(fakeredis.FakeAsyncRedis(server=fake_server), "test")
+    return server.ResponseCache(server.LRUCache(10, 30), backend)
+
+
+async def wait_for_generation(cache: server.ResponseCache, namespace: str, generation: int) -> None:
+    for _ in range(100):
+        if cache.generations.get(namespace) == generation:
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail(f"{namespace} never reached generation {generation}")
+
+
+async def test_concurrent_misses_across_instances_load_once():
+    fake_server = fakeredis.FakeServer()
+    first, second = make_cache(fake_server), make_cache(fake_server)
+    calls = []
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"payload"
+    results = await asyncio.gather(*(cache.get_or_load("users", "page", load) for cache in (first, second) for _ in range(5)))
+    assert results == [b"payload"] * 10
+    assert len(calls) == 1
+    assert first.coalesced + second.coalesced == 8
+    assert first.loads + second.loads == 1
+    await first.stop()
+    await second.stop()
+
+
+async def test_invalidation_reaches_other_instances():
+    fake_server = fakeredis.FakeServer()
+    first, second = make_cache(fake_server), make_cache(fake_server)
+    await first.start()
+    await second.start()
+    await asyncio.sleep(0.05)
+    versions = iter([b"v1", b"v2"])
+    async def load():
+        return next(versions)
+    assert await first.get_or_load("events", "page", load) == b"v1"
+    assert await second.get_or_load("events", "page", load) == b"v1"
+    assert second.shared_hits == 1
+    await first.invalidate("events")
+    await wait_for_generation(second, "events", 1)
+    assert len(second.local) == 0
+    assert await second.get_or_load("events", "page", load) == b"v2"
+    assert await first.get_or_load("events", "page", load) == b"v2"
+    assert first.shared_hits == 1
+    await first.stop()
+    await second.stop()
+
+
+async def test_restarted_instance_picks_up_missed_generations():
+    fake_server = fakeredis.FakeServer()
+    first, second = make_cache(fake_server), make_cache(fake_server)
+    await first.invalidate("stats")
+    await first.invalidate("stats")
+    await second.start()
+    await wait_for_generation(second, "stats", 2)
+    await first.stop()
+    await second.stop()
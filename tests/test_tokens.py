@@ -0,0 +1,91 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def sign(claims: dict) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(minutes=5)
+    return jwt.encode({"exp": expire, "iat": int(time.time()), **claims}, server.SECRET_KEY, algorithm=server.ALGORITHM)
+
+
+async def test_refresh_rotates_token_pair(client, login):
+    tokens = await login()
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"]
+    response = await client.get("/api/users/me", headers=bearer(rotated["token"]))
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "chief@scout.com"
+    response = await client.post("/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+
+async def test_access_token_is_not_a_refresh_token(client, login):
+    tokens = await login()
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["token"]})
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_by_token_version(client, login):
+    tokens = await login()
+    response = await client.post("/api/auth/logout", headers=bearer(tokens["token"]))
+    assert response.status_code == 200, response.text
+    assert (await server.db.users.find_one({"email": "chief@scout.com"}))["token_version"] == 1
+
+    response = await client.get("/api/users/me", headers=bearer(tokens["token"]))
+    assert response.status_code == 401
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    server.token_revocations._revoked.clear()
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    fresh = await login()
+    response = await client.get("/api/users/me", headers=bearer(fresh["token"]))
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/auth/refresh", json={"refresh_token": fresh["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+
+async def test_refresh_rejected_for_recreated_account(client, login, chief_headers):
+    response = await client.post("/api/users", headers=chief_headers, json={
+        "name": "Scout", "email": "scout@scout.com", "role": "user", "password": "demo123"
+    })
+    assert response.status_code == 200, response.text
+    tokens = await login("scout@scout.com")
+    await server.db.users.delete_one({"email": "scout@scout.com"})
+    await server.db.users.insert_one({
+        "name": "Scout", "email": "scout@scout.com", "role": "user", "password_hash": "",
+        "events_joined_count": 0, "achievements": []
+    })
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+async def test_legacy_token_without_role_loads_user(client, database):
+    token = sign({"sub": "chief@scout.com", "type": "access"})
+    response = await client.get("/api/users", headers=bearer(token))
+    assert response.status_code == 200, response.text
+
+    await database.users.delete_one({"email": "chief@scout.com"})
+    server.principal_cache.clear()
+    response = await client.get("/api/users", headers=bearer(token))
+    assert response.status_code == 401
+
+
+async def test_issued_at_within_leeway_is_accepted(client, database):
+    token = sign({"sub": "chief@scout.com", "role": "chief", "iat": int(time.time()) + 2})
+    response = await client.get("/api/users/me", headers=bearer(token))
+    assert response.status_code == 200, response.text